@@ -1,6 +1,7 @@
 from django.contrib import admin
 
-from .models import Bet, Driver, Race, RaceDriver, User
+from .authentication import save_credentials
+from .models import Bet, Driver, IdempotencyKey, LeaderboardEntry, Race, RaceDriver, RaceResult, User
 
 
 @admin.register(User)
@@ -11,6 +12,13 @@ class UserAdmin(admin.ModelAdmin):
     list_per_page = 25
     date_hierarchy = 'created_at'
     readonly_fields = ('created_at',)
+
+    def save_model(self, request, obj, form, change):
+        if change and {'role', 'banned'} & set(form.changed_data):
+            # Comme les vues d'administration : les jetons émis avant le changement sont refusés
+            save_credentials(obj, form.changed_data)
+        else:
+            super().save_model(request, obj, form, change)
     
     fieldsets = (
         ('Informations de connexion', {
@@ -73,6 +81,14 @@ class RaceDriverAdmin(admin.ModelAdmin):
     )
 
 
+@admin.register(RaceResult)
+class RaceResultAdmin(admin.ModelAdmin):
+    list_display = ('race', 'pole_sitter', 'settled_at', 'updated_at')
+    search_fields = ('race__name', 'pole_sitter')
+    list_per_page = 25
+    readonly_fields = ('settled_at', 'created_at', 'updated_at')
+
+
 @admin.register(Bet)
 class BetAdmin(admin.ModelAdmin):
     list_display = ('id', 'user', 'race', 'bet_type', 'selection', 'amount', 'odds', 'potential_win', 'status', 'created_at')
@@ -95,3 +111,21 @@ class BetAdmin(admin.ModelAdmin):
             'fields': ('created_at', 'updated_at')
         }),
     )
+
+
+@admin.register(LeaderboardEntry)
+class LeaderboardEntryAdmin(admin.ModelAdmin):
+    list_display = ('user', 'profit', 'total_bets', 'total_wins', 'total_losses')
+    search_fields = ('user__email', 'user__name')
+    ordering = ('-profit',)
+    list_per_page = 25
+    readonly_fields = ('user', 'profit', 'total_bets', 'total_wins', 'total_losses')
+
+
+@admin.register(IdempotencyKey)
+class IdempotencyKeyAdmin(admin.ModelAdmin):
+    list_display = ('key', 'user', 'status_code', 'created_at')
+    search_fields = ('key', 'user__email')
+    list_filter = ('status_code', 'created_at')
+    list_per_page = 25
+    readonly_fields = ('user', 'key', 'fingerprint', 'status_code', 'response', 'created_at')
@@ -0,0 +1,135 @@
+import copy
+from typing import Iterable, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt import authentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from .models import User
+from .revocation import revocations
+from .worker import TTLCache
+
+# Claim des jetons portant `User.auth_version` au moment de leur émission
+VERSION_CLAIM = 'ver'
+
+
+def version_key(user_id: int) -> str:
+    return f'auth:version:{user_id}'
+
+
+class UserCache:
+    """Per-worker `TTLCache` of user rows, keyed on the user id.
+
+    Entries are tagged with the `auth_version` of the row; a lookup with
+    another version is a miss. Callers get a copy, never the cached instance.
+    """
+
+    def __init__(self, max_size: int, ttl: float):
+        self._rows: TTLCache[User] = TTLCache(max_size, ttl)
+
+    def get(self, user_id: int, version: int) -> Optional[User]:
+        user = self._rows.get(user_id)
+        if user is None:
+            return None
+        if user.auth_version != version:
+            self._rows.discard(user_id)
+            return None
+        return copy.copy(user)
+
+    def set(self, user: User) -> None:
+        self._rows.set(user.pk, copy.copy(user))
+
+    def discard(self, user_id: int) -> None:
+        self._rows.discard(user_id)
+
+    def clear(self) -> None:
+        self._rows.clear()
+
+
+user_cache = UserCache(
+    max_size=settings.AUTH_USER_CACHE_SIZE,
+    ttl=settings.AUTH_USER_CACHE_TTL.total_seconds(),
+)
+
+
+def refresh_token_for(user: User) -> RefreshToken:
+    """simplejwt's refresh token, with the user's credentials version (copied into its access tokens)."""
+    refresh = RefreshToken.for_user(user)
+    refresh[VERSION_CLAIM] = user.auth_version
+    return refresh
+
+
+def save_credentials(user: User, update_fields: Iterable[str]) -> None:
+    """Save a change of role or ban and invalidate the tokens issued before it.
+
+    Bumps `auth_version`: the cached rows of every worker stop matching, and
+    tokens carrying the previous version are refused. The new version is
+    published to the shared cache once the transaction commits.
+    """
+    user.auth_version += 1
+    user.save(update_fields=[*update_fields, 'auth_version'])
+    user_cache.discard(user.pk)
+    version = user.auth_version
+    transaction.on_commit(lambda: cache.set(version_key(user.pk), version, None))
+
+
+class JWTAuthentication(authentication.JWTAuthentication):
+    """simplejwt's authentication without the per-request user query.
+
+    The current `auth_version` of each user is read from the Django cache and
+    the user row from the worker's `user_cache`; only a miss loads the row.
+    A token whose version claim is older than the user's was issued before a
+    role or ban change and is refused, as is a token revoked by a logout
+    (see `api.revocation`). Tokens without the claim go through simplejwt's
+    user lookup unchanged.
+
+    A version read from the database is kept `AUTH_USER_CACHE_TTL` in the
+    cache. With the default per-worker cache, a change made by another worker
+    is therefore seen within that delay (one minute), not at once as with a
+    shared cache.
+    """
+
+    def get_validated_token(self, raw_token):
+        token = super().get_validated_token(raw_token)
+        # Filtre de Bloom en mémoire : une requête seulement si le jti y figure
+        jti = token.get(api_settings.JTI_CLAIM)
+        if jti and revocations.is_revoked(jti):
+            raise InvalidToken('Jeton révoqué')
+        return token
+
+    def get_user(self, validated_token):
+        version = validated_token.get(VERSION_CLAIM)
+        if version is None:
+            return super().get_user(validated_token)
+        try:
+            user_id = int(validated_token[api_settings.USER_ID_CLAIM])
+        except (KeyError, TypeError, ValueError):
+            raise InvalidToken('Jeton sans identifiant utilisateur')
+
+        current = cache.get(version_key(user_id))
+        user = user_cache.get(user_id, current) if current is not None else None
+        if user is None:
+            user = User.objects.filter(pk=user_id).first()
+            if user is None:
+                raise AuthenticationFailed('Utilisateur introuvable', code='user_not_found')
+            # La base fait foi : version lue gardée AUTH_USER_CACHE_TTL, puis relue
+            ttl = settings.AUTH_USER_CACHE_TTL.total_seconds()
+            if current is None:
+                # add() ne remplace pas une version publiée entre-temps
+                cache.add(version_key(user_id), user.auth_version, ttl)
+            elif user.auth_version > current:
+                # Changement fait par un autre worker, sans cache partagé
+                cache.set(version_key(user_id), user.auth_version, ttl)
+            current = user.auth_version
+            user_cache.set(user)
+
+        if version != current:
+            raise AuthenticationFailed('Session expirée, reconnectez-vous', code='token_not_valid')
+        if not user.is_active:
+            raise AuthenticationFailed('Compte désactivé', code='user_inactive')
+        return user
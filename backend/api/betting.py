@@ -0,0 +1,131 @@
+from decimal import Decimal, InvalidOperation
+from typing import Any, Dict, Iterable, List, Mapping
+
+from django.db import transaction
+from django.db.models import Exists, F, OuterRef
+from rest_framework import status
+
+from .leaderboard import bets_placed
+from .models import Bet, Race, RaceResult, User
+from .odds import odds_index
+from .params import parse_id
+
+CENT = Decimal('0.01')
+
+
+class InsufficientBalance(Exception):
+    """Raised when a conditional debit finds a balance lower than the stake."""
+
+
+class BetRejected(Exception):
+    """Raised when a bet selection is invalid; carries the API error payload."""
+
+    def __init__(self, error: str, status_code: int = status.HTTP_400_BAD_REQUEST, **extra: Any):
+        super().__init__(error)
+        self.payload = {'error': error, **extra}
+        self.status_code = status_code
+
+
+def races_for_betting(race_ids: Iterable[int]) -> Dict[int, Race]:
+    """Load the races bets may refer to, flagged with `has_result` in the same query."""
+    return Race.objects.annotate(
+        has_result=Exists(RaceResult.objects.filter(race=OuterRef('pk')))
+    ).in_bulk(race_ids)
+
+
+def clean_selection(data: Mapping[str, Any], races: Mapping[int, Race]) -> Dict[str, Any]:
+    """Validate one bet selection sent by the client.
+
+    `races` holds the races loaded by `races_for_betting()`, and the
+    odds are checked against the in-memory odds index, so validating a
+    selection never queries the database. Returns the keyword arguments of
+    the `Bet` to create.
+    """
+    race_id = data.get('raceId')
+    bet_type = data.get('betType')
+    selection = data.get('selection')
+    amount = data.get('amount')
+    odds = data.get('odds')
+
+    if not all([race_id, bet_type, selection, amount, odds]):
+        raise BetRejected('Tous les champs sont requis')
+
+    race = races.get(parse_id(race_id))
+    if race is None:
+        raise BetRejected('Course introuvable', status.HTTP_404_NOT_FOUND)
+    if race.has_result:
+        # Résultat connu : un pari placé maintenant serait réglé à coup sûr
+        raise BetRejected('Les paris sont clos pour cette course')
+
+    if not isinstance(bet_type, str) or bet_type not in dict(Bet.BET_TYPE_CHOICES):
+        raise BetRejected('Type de pari invalide')
+    if not isinstance(selection, str):
+        raise BetRejected('Sélection invalide')
+
+    try:
+        amount = Decimal(str(amount))
+        odds = Decimal(str(odds))
+        # NaN et infinis ne se comparent pas à zéro
+        if not amount.is_finite() or not odds.is_finite():
+            raise InvalidOperation
+        amount = amount.quantize(CENT)
+        odds = odds.quantize(CENT)
+    except InvalidOperation:
+        raise BetRejected('Montant ou cote invalide')
+
+    if amount <= 0 or odds <= 0:
+        raise BetRejected('Montant ou cote invalide')
+
+    current_odds = odds_index.get(race.pk, selection, bet_type)
+    if current_odds is None:
+        raise BetRejected("Ce pilote n'est pas engagé sur cette course")
+    if current_odds != odds:
+        raise BetRejected('La cote a changé', status.HTTP_409_CONFLICT, odds=float(current_odds))
+
+    return {'race': race, 'bet_type': bet_type, 'selection': selection, 'amount': amount, 'odds': odds}
+
+
+def debit_balance(user_id: int, amount: Decimal) -> None:
+    """Debit `amount` from the user's balance only if it covers the stake.
+
+    The check and the write are a single UPDATE evaluated by the database, so
+    concurrent debits on the same user can never overdraw the balance nor
+    overwrite each other (no read-modify-write in Python).
+    """
+    debited = User.objects.filter(pk=user_id, balance__gte=amount).update(balance=F('balance') - amount)
+    if not debited:
+        raise InsufficientBalance
+
+
+def place_bet(user: User, race: Race, bet_type: str, selection: str, amount: Decimal, odds: Decimal) -> Bet:
+    """Insert a bet and debit its stake atomically.
+
+    The debit runs last so that the user row is locked only for the instant
+    before commit; if it fails the bet insert is rolled back with it.
+    """
+    with transaction.atomic():
+        bet = Bet.objects.create(
+            user=user,
+            race=race,
+            bet_type=bet_type,
+            selection=selection,
+            amount=amount,
+            odds=odds,
+        )
+        bets_placed(user.pk)
+        debit_balance(user.pk, amount)
+    return bet
+
+
+def place_bets(user: User, selections: List[Dict[str, Any]]) -> List[Bet]:
+    """Insert a whole bet slip and debit its total stake in one transaction."""
+    bets = [Bet(user=user, **selection) for selection in selections]
+    for bet in bets:
+        # bulk_create ne passe pas par Bet.save()
+        bet.potential_win = bet.amount * bet.odds
+
+    with transaction.atomic():
+        Bet.objects.bulk_create(bets)
+        bets_placed(user.pk, len(bets))
+        debit_balance(user.pk, sum((bet.amount for bet in bets), Decimal('0.00')))
+    return bets
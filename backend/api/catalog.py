@@ -0,0 +1,303 @@
+import hashlib
+import threading
+import time
+import uuid
+from datetime import datetime
+from functools import wraps
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, Max
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, parse_http_date_safe, quote_etag
+from rest_framework import status
+from rest_framework.response import Response
+
+from .models import Driver, Race, RaceDriver
+
+VERSION_KEY = 'catalog:version'
+
+# (empreinte de la version, date de dernière modification)
+Version = Tuple[str, Optional[datetime]]
+
+
+def database_stamp() -> str:
+    """Row count and last update of each catalog table, as stored in the database."""
+    parts = []
+    for model in (Race, Driver, RaceDriver):
+        stamps = model.objects.aggregate(count=Count('pk'), updated=Max('updated_at'))
+        parts.append(f"{stamps['count']}:{stamps['updated']}")
+    return '|'.join(parts)
+
+
+_stamp_lock = threading.Lock()
+# (instant de la dernière lecture, empreinte lue)
+_database_stamp: Optional[Tuple[float, str]] = None
+
+
+def refresh_database_stamp() -> None:
+    """Re-read `database_stamp()` now instead of at the next `CATALOG_VERSION_REFRESH`."""
+    global _database_stamp
+    _database_stamp = (time.monotonic(), database_stamp())
+
+
+def catalog_version() -> str:
+    """Version of the races, drivers and odds, replaced whenever one of them changes.
+
+    Combines the stamp that `invalidate_catalog()` publishes in the Django
+    cache, seen at once by the worker that made the change (by every worker
+    when the cache is shared), with `database_stamp()`, re-read every
+    `CATALOG_VERSION_REFRESH` at most: with a per-worker cache, the other
+    workers see the change after that delay.
+    """
+    checked = _database_stamp
+    if checked is None or time.monotonic() - checked[0] >= settings.CATALOG_VERSION_REFRESH.total_seconds():
+        with _stamp_lock:
+            if _database_stamp is checked:
+                refresh_database_stamp()
+
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        # Cache vidé ou premier démarrage : on publie une version commune
+        cache.add(VERSION_KEY, uuid.uuid4().hex, None)
+        version = cache.get(VERSION_KEY)
+    return f'{version}:{_database_stamp[1]}'
+
+
+def invalidate_catalog() -> None:
+    """Publish a new catalog version once the current transaction commits."""
+    transaction.on_commit(lambda: cache.set(VERSION_KEY, uuid.uuid4().hex, None))
+
+
+@receiver(post_save, sender=Race)
+@receiver(post_delete, sender=Race)
+@receiver(post_save, sender=Driver)
+@receiver(post_delete, sender=Driver)
+@receiver(post_save, sender=RaceDriver)
+@receiver(post_delete, sender=RaceDriver)
+def catalog_changed(sender, **kwargs):
+    # Couvre les vues d'administration, l'admin Django, les scripts et les
+    # suppressions en cascade ; les écritures en masse (bulk_create, update)
+    # appellent invalidate_catalog() explicitement.
+    invalidate_catalog()
+
+
+# Les listes n'ont pas de date de dernière modification : supprimer une ligne change
+# le compte, donc l'ETag, mais pas Max(updated_at). Elles ne sont validées que par ETag.
+
+def race_list_version() -> Version:
+    stamps = Race.objects.aggregate(count=Count('pk'), updated=Max('updated_at'))
+    return f"races:{stamps['count']}:{stamps['updated']}", None
+
+
+def race_version(race_id: int) -> Optional[Version]:
+    updated = Race.objects.filter(pk=race_id).values_list('updated_at', flat=True).first()
+    if updated is None:
+        return None
+    return f'race:{race_id}:{updated}', updated
+
+
+def race_drivers_version(race_id: int) -> Optional[Version]:
+    stamps = (
+        Race.objects.filter(pk=race_id)
+        .values('pk')
+        .annotate(
+            count=Count('entries'),
+            entries_updated=Max('entries__updated_at'),
+            drivers_updated=Max('entries__driver__updated_at'),
+        )
+        .first()
+    )
+    if stamps is None:
+        return None
+    tag = f"race-drivers:{race_id}:{stamps['count']}:{stamps['entries_updated']}:{stamps['drivers_updated']}"
+    return tag, None
+
+
+def race_card_version(race_id: int) -> Optional[Version]:
+    stamps = (
+        Race.objects.filter(pk=race_id)
+        .values('pk', 'updated_at')
+        .annotate(
+            count=Count('entries'),
+            entries_updated=Max('entries__updated_at'),
+            drivers_updated=Max('entries__driver__updated_at'),
+        )
+        .first()
+    )
+    if stamps is None:
+        return None
+    # Liste des engagés incluse : validée par ETag seulement, comme les listes
+    tag = (
+        f"race-card:{race_id}:{stamps['updated_at']}:{stamps['count']}:"
+        f"{stamps['entries_updated']}:{stamps['drivers_updated']}"
+    )
+    return tag, None
+
+
+def race_card(race_id: int) -> Optional[Tuple[Race, List[RaceDriver]]]:
+    """A race and its entries (with their drivers), from one joined query.
+
+    The race comes along with its first entry; only a race without any entry
+    needs a second query. Returns None when the race does not exist.
+    """
+    entries = list(RaceDriver.objects.filter(race_id=race_id).select_related('race', 'driver').order_by('pk'))
+    if entries:
+        return entries[0].race, entries
+    race = Race.objects.filter(pk=race_id).first()
+    return (race, []) if race is not None else None
+
+
+def driver_list_version() -> Version:
+    stamps = Driver.objects.aggregate(count=Count('pk'), updated=Max('updated_at'))
+    return f"drivers:{stamps['count']}:{stamps['updated']}", None
+
+
+def conditional_get(version_func):
+    """Answer GET requests with 304 when the client already has the current version.
+
+    `version_func(**kwargs)` receives the URL arguments of the view and returns
+    a `(tag, last_modified)` pair computed from change stamps only, or None
+    when the resource does not exist (the view then runs normally). Matching
+    `If-None-Match` / `If-Modified-Since` requests are answered before any
+    model row is loaded or serialized; other responses carry `ETag` and,
+    unless `last_modified` is None, `Last-Modified` headers.
+    """
+
+    def decorator(method):
+        @wraps(method)
+        def wrapper(self, request, *args, **kwargs):
+            version = version_func(*args, **kwargs)
+            if version is None:
+                return method(self, request, *args, **kwargs)
+
+            tag, updated = version
+            etag = quote_etag(hashlib.md5(tag.encode()).hexdigest())
+            last_modified = int(updated.timestamp()) if updated else None
+
+            response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+            if response is None:
+                response = method(self, request, *args, **kwargs)
+            if response.status_code == 304 or status.is_success(response.status_code):
+                response['ETag'] = etag
+                if last_modified is not None:
+                    response['Last-Modified'] = http_date(last_modified)
+                # Le navigateur revalide à chaque fois, mais sans retélécharger
+                patch_cache_control(response, no_cache=True)
+            return response
+
+        return wrapper
+
+    return decorator
+
+
+class RenderedResponse(NamedTuple):
+    version: str
+    body: bytes
+    content_type: str
+    headers: Dict[str, str]
+
+
+class RenderedResponseCache:
+    """Per-worker cache of rendered catalog responses, tagged with the catalog version.
+
+    With `CATALOG_CACHE_SHARED`, entries are also written to the Django cache
+    (Redis) so that a worker can reuse a body rendered by another one.
+    """
+
+    MAX_ENTRIES = 1024
+    SHARED_TIMEOUT = 24 * 3600
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries: Dict[Tuple[str, str], RenderedResponse] = {}
+
+    def get(self, key: Tuple[str, str], version: str) -> Optional[RenderedResponse]:
+        entry = self._entries.get(key)
+        if entry is not None and entry.version == version:
+            return entry
+        if settings.CATALOG_CACHE_SHARED:
+            entry = cache.get(self._shared_key(key, version))
+            if entry is not None:
+                self._store(key, RenderedResponse(*entry))
+                return self._entries[key]
+        return None
+
+    def set(self, key: Tuple[str, str], entry: RenderedResponse) -> None:
+        self._store(key, entry)
+        if settings.CATALOG_CACHE_SHARED:
+            cache.set(self._shared_key(key, entry.version), tuple(entry), self.SHARED_TIMEOUT)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries = {}
+
+    def _store(self, key, entry):
+        with self._lock:
+            if len(self._entries) >= self.MAX_ENTRIES and key not in self._entries:
+                self._entries = {}
+            self._entries[key] = entry
+
+    @staticmethod
+    def _shared_key(key, version):
+        path, media_type = key
+        return 'catalog:response:' + hashlib.md5(f'{version}|{path}|{media_type}'.encode()).hexdigest()
+
+
+rendered_responses = RenderedResponseCache()
+
+
+def cached_rendering(method):
+    """Serve a public catalog GET from its rendered bytes while the catalog is unchanged.
+
+    A hit costs a dict lookup: no query, no serializer, no renderer. It also
+    answers `If-None-Match` / `If-Modified-Since` with 304 from the stored
+    validators. A miss runs the view (and `conditional_get`) and keeps the
+    rendered body until the catalog version changes.
+
+    Entries are keyed on the path and the media type only: none of the
+    catalog views reads the query string, so `?x=1`, `?x=2`... share the
+    entry of the bare path instead of each filling the cache.
+    """
+
+    @wraps(method)
+    def wrapper(self, request, *args, **kwargs):
+        renderer = request.accepted_renderer
+        if renderer.format == 'api':
+            return method(self, request, *args, **kwargs)
+
+        key = (request.path, request.accepted_media_type)
+        version = catalog_version()
+        entry = rendered_responses.get(key, version)
+
+        if entry is None:
+            response = method(self, request, *args, **kwargs)
+            if not isinstance(response, Response) or response.status_code != status.HTTP_200_OK:
+                return response
+            content_type = renderer.media_type
+            if renderer.charset:
+                content_type = f'{content_type}; charset={renderer.charset}'
+            body = renderer.render(response.data, request.accepted_media_type, self.get_renderer_context())
+            headers = {name: response[name] for name in ('ETag', 'Last-Modified', 'Cache-Control') if response.has_header(name)}
+            entry = RenderedResponse(version, body, content_type, headers)
+            rendered_responses.set(key, entry)
+        else:
+            last_modified = entry.headers.get('Last-Modified')
+            not_modified = get_conditional_response(
+                request,
+                etag=entry.headers.get('ETag'),
+                last_modified=parse_http_date_safe(last_modified) if last_modified else None,
+            )
+            if not_modified is not None:
+                for name, value in entry.headers.items():
+                    not_modified[name] = value
+                return not_modified
+
+        return HttpResponse(entry.body, content_type=entry.content_type, headers=entry.headers)
+
+    return wrapper
@@ -0,0 +1,17 @@
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+
+@receiver(connection_created)
+def apply_sqlite_pragmas(sender, connection, **kwargs):
+    """Set `SQLITE_PRAGMAS` on every new SQLite connection (production profile).
+
+    Executed on the raw sqlite3 connection: the pragmas are not logged as
+    queries of the request that opened the connection.
+    """
+    if connection.vendor != 'sqlite' or not settings.SQLITE_PRAGMAS:
+        return
+    for name, value in settings.SQLITE_PRAGMAS.items():
+        # Les pragmas n'acceptent pas de paramètres ; les valeurs viennent des réglages
+        connection.connection.execute(f'PRAGMA {name} = {value}')
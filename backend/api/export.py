@@ -0,0 +1,99 @@
+import csv
+from datetime import datetime, time, timedelta
+from typing import Iterator, Mapping, Optional
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import QuerySet
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from .models import Bet
+
+FORMATS = {
+    'csv': 'text/csv; charset=utf-8',
+    'ndjson': 'application/x-ndjson',
+}
+
+# (colonne exportée, champ lu en base)
+COLUMNS = (
+    ('id', 'id'),
+    ('userId', 'user_id'),
+    ('userEmail', 'user__email'),
+    ('raceId', 'race_id'),
+    ('raceName', 'race__name'),
+    ('betType', 'bet_type'),
+    ('selection', 'selection'),
+    ('amount', 'amount'),
+    ('odds', 'odds'),
+    ('potentialWin', 'potential_win'),
+    ('status', 'status'),
+    ('placedAt', 'created_at'),
+)
+
+CHUNK_SIZE = 2000
+
+
+class ExportError(ValueError):
+    pass
+
+
+def _day_start(value: str, name: str) -> datetime:
+    day = parse_date(value) if value else None
+    if day is None:
+        raise ExportError(f'{name} invalide (format AAAA-MM-JJ)')
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def export_queryset(
+    date_from: Optional[str] = None,
+    date_to: Optional[str] = None,
+    race: Optional[str] = None,
+    status: Optional[str] = None,
+) -> QuerySet:
+    """Bets placed between `date_from` and `date_to` (inclusive days), optionally
+    of one race and one status, as plain value tuples in placement order."""
+    bets = Bet.objects.all()
+    if date_from:
+        bets = bets.filter(created_at__gte=_day_start(date_from, 'Date de début'))
+    if date_to:
+        # Jour de fin inclus : borne exclusive au lendemain minuit, l'index reste utilisable
+        bets = bets.filter(created_at__lt=_day_start(date_to, 'Date de fin') + timedelta(days=1))
+    if race:
+        try:
+            bets = bets.filter(race_id=int(race))
+        except ValueError:
+            raise ExportError('Course invalide')
+    if status:
+        if status not in dict(Bet.BET_STATUS_CHOICES):
+            raise ExportError('Statut invalide')
+        bets = bets.filter(status=status)
+    return bets.order_by('created_at', 'id').values_list(*(field for _, field in COLUMNS))
+
+
+def export_from_params(params: Mapping[str, str]) -> QuerySet:
+    return export_queryset(params.get('from'), params.get('to'), params.get('race'), params.get('status'))
+
+
+class _Line:
+    """File-like object whose `write` returns the line instead of storing it."""
+
+    def write(self, value: str) -> str:
+        return value
+
+
+def export_lines(rows: QuerySet, fmt: str) -> Iterator[str]:
+    """Yield `rows` as CSV or NDJSON lines, reading them from the database by chunks.
+
+    Only one chunk of value tuples is held in memory at a time, whatever the
+    number of exported bets.
+    """
+    names = [name for name, _ in COLUMNS]
+    if fmt == 'csv':
+        writer = csv.writer(_Line())
+        yield writer.writerow(names)
+        for row in rows.iterator(chunk_size=CHUNK_SIZE):
+            yield writer.writerow(row)
+    else:
+        encoder = DjangoJSONEncoder(ensure_ascii=False)
+        for row in rows.iterator(chunk_size=CHUNK_SIZE):
+            yield encoder.encode(dict(zip(names, row))) + '\n'
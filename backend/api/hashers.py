@@ -0,0 +1,119 @@
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Optional, TypeVar
+
+import django
+from django.conf import settings
+from django.contrib.auth import hashers
+from django.contrib.auth.backends import ModelBackend
+
+from .models import User
+
+T = TypeVar('T')
+
+
+class HashingBusy(Exception):
+    """Raised when every hashing slot stays taken for `PASSWORD_HASHING_WAIT` seconds."""
+
+
+class ProfileCost:
+    """Hasher whose cost parameters come from `PASSWORD_HASHER_COSTS[profile]`.
+
+    The algorithm name is unchanged, so existing hashes still verify; a hash
+    made with another cost is reported by `must_update()` and rewritten at the
+    next successful login.
+    """
+
+    profile = ''
+
+    def __init__(self):
+        super().__init__()
+        for name, value in settings.PASSWORD_HASHER_COSTS.get(self.profile, {}).items():
+            setattr(self, name, value)
+
+
+class PBKDF2PasswordHasher(ProfileCost, hashers.PBKDF2PasswordHasher):
+    profile = 'pbkdf2'
+
+
+class ScryptPasswordHasher(ProfileCost, hashers.ScryptPasswordHasher):
+    profile = 'scrypt'
+
+
+class Argon2PasswordHasher(ProfileCost, hashers.Argon2PasswordHasher):
+    profile = 'argon2'
+
+
+# ---------- Pool de hachage ----------
+
+_lock = threading.Lock()
+_pool: Optional[ProcessPoolExecutor] = None
+_slots: Optional[threading.BoundedSemaphore] = None
+
+
+def _pool_and_slots():
+    global _pool, _slots
+    with _lock:
+        if _pool is None:
+            # spawn : pas de fork d'un worker qui a des threads et des connexions ouvertes
+            _pool = ProcessPoolExecutor(
+                max_workers=settings.PASSWORD_HASHING_WORKERS,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=django.setup,
+            )
+            _slots = threading.BoundedSemaphore(settings.PASSWORD_HASHING_QUEUE)
+    return _pool, _slots
+
+
+def offload(func: Callable[..., T], *args) -> T:
+    """Run `func(*args)` in the hashing process pool, or inline if it is disabled.
+
+    At most `PASSWORD_HASHING_QUEUE` calls are running or queued at once; a
+    request thread waits up to `PASSWORD_HASHING_WAIT` seconds for a slot,
+    then gets `HashingBusy` instead of piling up behind a login storm.
+    """
+    if not settings.PASSWORD_HASHING_WORKERS:
+        return func(*args)
+    pool, slots = _pool_and_slots()
+    if not slots.acquire(timeout=settings.PASSWORD_HASHING_WAIT):
+        raise HashingBusy
+    try:
+        return pool.submit(func, *args).result()
+    finally:
+        slots.release()
+
+
+def hash_password(password: str) -> str:
+    """`make_password()` with the current profile, computed off the request thread."""
+    return offload(hashers.make_password, password)
+
+
+def check_user_password(user: Optional[User], password: str) -> bool:
+    """Check `password` off the request thread; rehash it if the profile or its cost changed.
+
+    With no user the hasher still runs once, so that unknown emails answer in
+    the same time as wrong passwords.
+    """
+    if user is None:
+        hash_password(password)
+        return False
+    correct, must_update = offload(hashers.verify_password, password, user.password)
+    if correct and must_update:
+        user.password = hash_password(password)
+        user.save(update_fields=['password'])
+    return correct
+
+
+class PasswordBackend(ModelBackend):
+    """ModelBackend checking passwords through the hashing pool."""
+
+    def authenticate(self, request, username=None, password=None, **kwargs):
+        if username is None:
+            username = kwargs.get(User.USERNAME_FIELD)
+        if username is None or password is None:
+            return None
+        user = User._default_manager.filter(**{User.USERNAME_FIELD: username}).first()
+        if check_user_password(user, password) and self.user_can_authenticate(user):
+            return user
+        return None
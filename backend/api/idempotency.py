@@ -0,0 +1,111 @@
+import hashlib
+import json
+from functools import wraps
+from typing import Tuple
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.response import Response
+
+from .models import IdempotencyKey
+from .worker import Every, TTLCache
+
+HEADER = 'Idempotency-Key'
+REPLAY_HEADER = 'Idempotent-Replayed'
+# Chaque worker purge les clés expirées toutes les PURGE_EVERY réponses enregistrées
+PURGE_EVERY = 1000
+
+# (fingerprint, status code, corps de la réponse)
+StoredResponse = Tuple[str, int, object]
+
+
+# Réponses enregistrées, par (utilisateur, clé)
+response_cache: TTLCache[StoredResponse] = TTLCache(
+    max_size=settings.IDEMPOTENCY_CACHE_SIZE,
+    ttl=settings.IDEMPOTENCY_KEY_TTL.total_seconds(),
+)
+_purge = Every(PURGE_EVERY)
+
+
+def purge_expired_keys() -> int:
+    """Delete the stored responses older than `IDEMPOTENCY_KEY_TTL`."""
+    deadline = timezone.now() - settings.IDEMPOTENCY_KEY_TTL
+    deleted, _ = IdempotencyKey.objects.filter(created_at__lt=deadline).delete()
+    return deleted
+
+
+def request_fingerprint(request) -> str:
+    payload = json.dumps(request.data, sort_keys=True, default=str)
+    return hashlib.sha256(f'{request.method} {request.path}\n{payload}'.encode()).hexdigest()
+
+
+def replay(stored: StoredResponse, fingerprint: str) -> Response:
+    stored_fingerprint, status_code, body = stored
+    if stored_fingerprint != fingerprint:
+        return Response(
+            {'error': "Clé d'idempotence déjà utilisée pour une autre requête"},
+            status=status.HTTP_422_UNPROCESSABLE_ENTITY,
+        )
+    return Response(body, status=status_code, headers={REPLAY_HEADER: 'true'})
+
+
+def idempotent(method):
+    """Make a write endpoint safe to retry with an `Idempotency-Key` header.
+
+    The first successful (2xx) response is stored together with the writes of
+    the view, in the same transaction; a retry with the same key returns it
+    from the per-worker cache or the `IdempotencyKey` table without running
+    the view again. Requests without the header are unaffected.
+    """
+
+    @wraps(method)
+    def wrapper(self, request, *args, **kwargs):
+        key = request.headers.get(HEADER)
+        if not key:
+            return method(self, request, *args, **kwargs)
+        if len(key) > 255:
+            return Response({'error': "Clé d'idempotence invalide"}, status=status.HTTP_400_BAD_REQUEST)
+
+        user_id = request.user.pk
+        fingerprint = request_fingerprint(request)
+
+        stored = response_cache.get((user_id, key))
+        if stored is None:
+            record = IdempotencyKey.objects.filter(user_id=user_id, key=key).first()
+            if record is not None:
+                stored = (record.fingerprint, record.status_code, record.response)
+                response_cache.set((user_id, key), stored)
+        if stored is not None:
+            return replay(stored, fingerprint)
+
+        try:
+            with transaction.atomic():
+                response = method(self, request, *args, **kwargs)
+                if not status.is_success(response.status_code):
+                    # Les erreurs n'ont aucun effet : un nouvel essai doit être réévalué
+                    return response
+                IdempotencyKey.objects.create(
+                    user_id=user_id,
+                    key=key,
+                    fingerprint=fingerprint,
+                    status_code=response.status_code,
+                    response=response.data,
+                )
+        except IntegrityError:
+            # Requête concurrente avec la même clé : ses écritures ont gagné, les nôtres sont annulées
+            record = IdempotencyKey.objects.filter(user_id=user_id, key=key).first()
+            if record is None:
+                raise
+            stored = (record.fingerprint, record.status_code, record.response)
+            response_cache.set((user_id, key), stored)
+            return replay(stored, fingerprint)
+
+        response_cache.set((user_id, key), (fingerprint, response.status_code, response.data))
+
+        if _purge.tick():
+            purge_expired_keys()
+        return response
+
+    return wrapper
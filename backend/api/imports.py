@@ -0,0 +1,172 @@
+from decimal import Decimal
+from itertools import islice
+from typing import Callable, Dict, Iterable, Iterator, List, Mapping, NamedTuple, Optional, Sequence, Tuple, Type, TypeVar
+
+from django.db import models, transaction
+from django.db.models import QuerySet
+
+from .catalog import invalidate_catalog
+from .leaderboard import reset_leaderboard
+from .models import Bet, Driver, Race, RaceDriver, RaceResult, User
+from .seed_data import DRIVERS_2025
+
+BATCH_SIZE = 1000
+DEFAULT_BASE_ODDS = Decimal('25.0')
+RESET_CHUNK_SIZE = 50_000
+RESET_BALANCE = Decimal('1000')
+# Tables vidées par la remise à zéro, les dépendantes d'abord (pas de cascade avec raw_delete)
+RESET_TABLES = (
+    ('bets', Bet),
+    ('raceResults', RaceResult),
+    ('raceDrivers', RaceDriver),
+    ('races', Race),
+    ('drivers', Driver),
+)
+# Clés naturelles des imports (contraintes d'unicité des modèles)
+DRIVER_KEY = ('name',)
+RACE_KEY = ('name', 'date')
+
+T = TypeVar('T')
+
+
+def chunks(items: Iterable[T], size: int = BATCH_SIZE) -> Iterator[List[T]]:
+    """Consecutive lists of at most `size` items, consuming `items` lazily."""
+    iterator = iter(items)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+def raw_delete(queryset: QuerySet) -> int:
+    """DELETE the rows of `queryset` in one statement, without loading them.
+
+    No signal and no cascade: callers delete the dependent tables first and
+    invalidate the caches themselves.
+    """
+    return queryset._raw_delete(queryset.db)
+
+
+class ImportReport(NamedTuple):
+    created: int
+    updated: int
+    unchanged: int
+
+    def as_data(self) -> Dict[str, int]:
+        return {'count': sum(self), **self._asdict()}
+
+
+def upsert(model: Type[models.Model], rows: Sequence[Mapping], key: Sequence[str]) -> ImportReport:
+    """Insert the new `rows` of `model` and update the changed ones, matched on the natural `key`.
+
+    The existing rows are read once, on the compared columns only; unchanged
+    rows are not written, so their `updated_at` (and the catalog versions
+    derived from it) stay as they are. Rows missing from `rows` are kept:
+    deleting them would cascade to the entries and the bets.
+    """
+    if not rows:
+        return ImportReport(0, 0, 0)
+    fields = [name for name in rows[0] if name not in key]
+    to_python = {name: model._meta.get_field(name).to_python for name in rows[0]}
+    existing = {
+        values[:len(key)]: values[len(key):]
+        for values in model.objects.filter(**{f'{key[0]}__in': {row[key[0]] for row in rows}}).values_list(*key, *fields)
+    }
+
+    created, changed = 0, []
+    for row in rows:
+        row = {name: to_python[name](value) for name, value in row.items()}
+        current = existing.get(tuple(row[name] for name in key))
+        if current == tuple(row[name] for name in fields):
+            continue
+        created += current is None
+        changed.append(model(**row))
+
+    # Les champs auto_now (updated_at) sont remis à jour sur les lignes modifiées seulement
+    stamps = [field.name for field in model._meta.concrete_fields if getattr(field, 'auto_now', False)]
+    if changed:
+        with transaction.atomic():
+            for batch in chunks(changed):
+                model.objects.bulk_create(batch, update_conflicts=True, unique_fields=key, update_fields=fields + stamps)
+            invalidate_catalog()
+    return ImportReport(created, len(changed) - created, len(rows) - len(changed))
+
+
+def driver_rows(drivers_data: Iterable[Mapping] = DRIVERS_2025) -> List[Dict]:
+    """Driver fields of the seed data, without the odds."""
+    return [{key: value for key, value in d.items() if key != 'base_odds'} for d in drivers_data]
+
+
+def delete_in_chunks(queryset: QuerySet, size: int = RESET_CHUNK_SIZE) -> Iterator[int]:
+    """Raw-delete the rows of `queryset` by chunks of at most `size` primary keys.
+
+    Each chunk is one `DELETE ... WHERE pk IN (SELECT pk ... LIMIT size)`:
+    the keys never reach Python. Yields the number of rows of each chunk.
+    """
+    pks = queryset.order_by('pk').values('pk')
+    while True:
+        deleted = raw_delete(queryset.model._base_manager.filter(pk__in=pks[:size]))
+        if deleted:
+            yield deleted
+        if deleted < size:
+            return
+
+
+def reset_betting_data(
+    size: int = RESET_CHUNK_SIZE, progress: Optional[Callable[[str, int], None]] = None,
+) -> Dict[str, int]:
+    """Delete every bet, result, entry, race and driver, then reset balances and the leaderboard.
+
+    Tables are emptied in dependency order by `delete_in_chunks`, without the
+    deletion collector; `progress(table, deleted so far)` is called after each
+    chunk. Run it in a transaction for an all-or-nothing reset; in autocommit
+    each chunk is committed, so an interrupted reset can simply be run again.
+    Returns the number of deleted rows per table.
+    """
+    deleted = {}
+    for label, model in RESET_TABLES:
+        deleted[label] = 0
+        for count in delete_in_chunks(model.objects.all(), size):
+            deleted[label] += count
+            if progress:
+                progress(label, deleted[label])
+
+    User.objects.update(balance=RESET_BALANCE)
+    reset_leaderboard()
+    invalidate_catalog()
+    return deleted
+
+
+def base_odds_by_name(drivers_data: Iterable[Mapping] = DRIVERS_2025) -> Dict[str, Decimal]:
+    return {d['name']: Decimal(str(d['base_odds'])) for d in drivers_data if 'base_odds' in d}
+
+
+def entry_odds(base: Decimal) -> Tuple[Decimal, Decimal, Decimal]:
+    """(winner, podium, pole) odds derived from a driver's base odds."""
+    return base, max(base * Decimal('0.6'), Decimal('1.50')), max(base * Decimal('0.8'), Decimal('1.80'))
+
+
+def import_associations(races: Sequence[Race], drivers: Sequence[Driver], base_odds: Mapping[str, Decimal]) -> int:
+    """Replace every race entry with one per (race, driver) pair, priced from `base_odds`.
+
+    The odds of each driver are computed once; the rows are built lazily and
+    written by batches of `BATCH_SIZE`, all in one transaction, so memory
+    stays at one batch whatever the size of the calendar.
+    """
+    odds = {driver.pk: entry_odds(base_odds.get(driver.name, DEFAULT_BASE_ODDS)) for driver in drivers}
+    entries = (
+        RaceDriver(
+            race_id=race.pk,
+            driver_id=driver.pk,
+            winner_odds=odds[driver.pk][0],
+            podium_odds=odds[driver.pk][1],
+            pole_odds=odds[driver.pk][2],
+        )
+        for race in races
+        for driver in drivers
+    )
+    with transaction.atomic():
+        # Aucune table ne référence RaceDriver : suppression directe, sans charger les lignes
+        raw_delete(RaceDriver.objects.all())
+        for batch in chunks(entries):
+            RaceDriver.objects.bulk_create(batch)
+        invalidate_catalog()
+    return len(races) * len(drivers)
@@ -0,0 +1,163 @@
+from decimal import Decimal
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from django.db.models import Count, DecimalField, F, IntegerField, OuterRef, Q, QuerySet, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from .models import Bet, LeaderboardBucket, LeaderboardEntry, Race, User
+
+MONEY = DecimalField(max_digits=14, decimal_places=2)
+
+
+def _per_user(bets: QuerySet, aggregate, output_field):
+    return Subquery(
+        bets.filter(user_id=OuterRef('user_id')).values('user_id').annotate(value=aggregate).values('value'),
+        output_field=output_field,
+    )
+
+
+def count_per_user(bets: QuerySet):
+    """Number of `bets` of the outer row's `user_id` (correlated subquery)."""
+    return Coalesce(_per_user(bets, Count('pk'), IntegerField()), Value(0))
+
+
+def sum_per_user(bets: QuerySet, field: str):
+    """Sum of `field` over the `bets` of the outer row's `user_id` (correlated subquery)."""
+    return Coalesce(_per_user(bets, Sum(field), MONEY), Value(Decimal('0.00')), output_field=MONEY)
+
+
+def bets_placed(user_id: int, count: int = 1) -> None:
+    LeaderboardEntry.objects.filter(user_id=user_id).update(total_bets=F('total_bets') + count)
+
+
+def bucket_keys(race: Race) -> List[str]:
+    return [LeaderboardBucket.race_key(race.pk), LeaderboardBucket.month_key(race.date)]
+
+
+def bet_settled(bet: Bet) -> None:
+    """Apply the outcome of one bet that just left the `pending` status."""
+    if bet.status == 'won':
+        changes = {'total_wins': F('total_wins') + 1, 'profit': F('profit') + bet.potential_win}
+    else:
+        changes = {'total_losses': F('total_losses') + 1, 'profit': F('profit') - bet.amount}
+    LeaderboardEntry.objects.filter(user_id=bet.user_id).update(**changes)
+
+    keys = bucket_keys(bet.race)
+    LeaderboardBucket.objects.bulk_create(
+        [LeaderboardBucket(bucket=key, user_id=bet.user_id) for key in keys],
+        ignore_conflicts=True,
+    )
+    LeaderboardBucket.objects.filter(bucket__in=keys, user_id=bet.user_id).update(
+        total_bets=F('total_bets') + 1, **changes
+    )
+
+
+def bets_settled(race: Race, settled: QuerySet, won: QuerySet, lost: QuerySet) -> None:
+    """Apply the outcome of the `settled` bets of `race`, just marked `won`/`lost`.
+
+    The global entries are updated with one UPDATE; the race and month buckets
+    are created if missing, then updated with one more.
+    """
+    changes = {
+        'total_wins': F('total_wins') + count_per_user(won),
+        'total_losses': F('total_losses') + count_per_user(lost),
+        'profit': F('profit') + sum_per_user(won, 'potential_win') - sum_per_user(lost, 'amount'),
+    }
+    bettors = settled.values('user_id')
+    LeaderboardEntry.objects.filter(user_id__in=bettors).update(**changes)
+
+    keys = bucket_keys(race)
+    LeaderboardBucket.objects.bulk_create(
+        (
+            LeaderboardBucket(bucket=key, user_id=user_id)
+            # Un DISTINCT par statut suit l'index (status, race, user) sans tri
+            for user_id in {
+                *won.values_list('user_id', flat=True).distinct(),
+                *lost.values_list('user_id', flat=True).distinct(),
+            }
+            for key in keys
+        ),
+        batch_size=1000,
+        ignore_conflicts=True,
+    )
+    LeaderboardBucket.objects.filter(bucket__in=keys, user_id__in=bettors).update(
+        total_bets=F('total_bets') + count_per_user(settled), **changes
+    )
+
+
+def rebuild_buckets(user_ids: Optional[List[int]] = None) -> None:
+    """Recompute the race and month buckets of `user_ids` (every user by default)."""
+    buckets = LeaderboardBucket.objects.all()
+    settled = Bet.objects.filter(status__in=['won', 'lost'])
+    if user_ids is not None:
+        buckets = buckets.filter(user_id__in=user_ids)
+        settled = settled.filter(user_id__in=user_ids)
+    buckets.delete()
+
+    rows = settled.values('user_id', 'race_id', 'race__date').annotate(
+        wins=Count('pk', filter=Q(status='won')),
+        losses=Count('pk', filter=Q(status='lost')),
+        won_amount=Sum('potential_win', filter=Q(status='won')),
+        lost_amount=Sum('amount', filter=Q(status='lost')),
+    ).order_by()
+
+    totals: Dict[Tuple[str, int], LeaderboardBucket] = {}
+    for row in rows.iterator():
+        profit = (row['won_amount'] or Decimal('0.00')) - (row['lost_amount'] or Decimal('0.00'))
+        for key in (LeaderboardBucket.race_key(row['race_id']), LeaderboardBucket.month_key(row['race__date'])):
+            bucket = totals.setdefault((key, row['user_id']), LeaderboardBucket(bucket=key, user_id=row['user_id']))
+            bucket.total_bets += row['wins'] + row['losses']
+            bucket.total_wins += row['wins']
+            bucket.total_losses += row['losses']
+            bucket.profit += profit
+    LeaderboardBucket.objects.bulk_create(totals.values(), batch_size=1000)
+
+
+def rebuild_leaderboard(user_ids: Optional[Iterable[int]] = None) -> None:
+    """Recompute the entries of `user_ids` (every user by default) from their bets."""
+    users = User.objects.filter(leaderboard_entry__isnull=True)
+    entries = LeaderboardEntry.objects.all()
+    if user_ids is not None:
+        user_ids = list(user_ids)
+        users = users.filter(pk__in=user_ids)
+        entries = entries.filter(user_id__in=user_ids)
+
+    LeaderboardEntry.objects.bulk_create(
+        (LeaderboardEntry(user_id=pk) for pk in users.values_list('pk', flat=True).iterator()),
+        batch_size=1000,
+        ignore_conflicts=True,
+    )
+
+    bets = Bet.objects.all()
+    entries.update(
+        total_bets=count_per_user(bets),
+        total_wins=count_per_user(bets.filter(status='won')),
+        total_losses=count_per_user(bets.filter(status='lost')),
+        profit=(
+            sum_per_user(bets.filter(status='won'), 'potential_win')
+            - sum_per_user(bets.filter(status='lost'), 'amount')
+        ),
+    )
+    rebuild_buckets(user_ids)
+
+
+def reset_leaderboard() -> None:
+    """Zero every entry and drop every bucket, after all bets have been deleted."""
+    LeaderboardEntry.objects.update(total_bets=0, total_wins=0, total_losses=0, profit=Decimal('0.00'))
+    LeaderboardBucket.objects.all().delete()
+
+
+def rank_of(entry: LeaderboardEntry) -> int:
+    """1-based rank of `entry`, counted on the (profit, user) index."""
+    ahead = LeaderboardEntry.objects.filter(
+        Q(profit__gt=entry.profit) | Q(profit=entry.profit, user_id__lt=entry.user_id)
+    ).count()
+    return ahead + 1
+
+
+@receiver(post_save, sender=User)
+def create_leaderboard_entry(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        LeaderboardEntry.objects.get_or_create(user=instance)
@@ -0,0 +1,140 @@
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import connection
+from rest_framework.test import APIClient
+
+from api import catalog
+from api.authentication import refresh_token_for
+from api.models import Driver, Race, RaceDriver, User
+
+PROFILES = ('', 'production')
+
+
+class UncachedResponses(catalog.RenderedResponseCache):
+    """Rendered-response cache that keeps nothing: every catalog read queries the database."""
+
+    def get(self, key, version):
+        return None
+
+    def set(self, key, entry):
+        pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare le débit d'écriture (PlaceBetView) et de lecture (RaceListView) sur SQLite, "
+        'sans puis avec le profil de production (DJANGO_SQLITE_PROFILE), sur une base jetable.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seconds', type=float, default=3.0, help='Durée de mesure par scénario')
+        parser.add_argument('--threads', type=int, default=8, help='Requêtes simultanées')
+        parser.add_argument('--races', type=int, default=100, help='Courses listées par RaceListView')
+        # Interne : mesure dans le processus courant, avec son profil
+        parser.add_argument('--measure', action='store_true', help=argparse.SUPPRESS)
+
+    def handle(self, *args, **options):
+        if options['measure']:
+            return self.measure(options)
+
+        # Un processus par profil : DATABASES est lu au démarrage de Django
+        arguments = ['--seconds', str(options['seconds']), '--threads', str(options['threads']), '--races', str(options['races'])]
+        for profile in PROFILES:
+            with tempfile.TemporaryDirectory() as directory:
+                env = {
+                    **os.environ,
+                    'DJANGO_SQLITE_PROFILE': profile,
+                    'DJANGO_SQLITE_PATH': os.path.join(directory, 'benchmark.sqlite3'),
+                }
+                result = subprocess.run(
+                    [sys.executable, '-m', 'django', 'benchmark_database', '--measure', *arguments],
+                    env=env,
+                    cwd=settings.BASE_DIR,
+                    capture_output=True,
+                    text=True,
+                )
+            if result.returncode:
+                self.stderr.write(result.stderr)
+                return
+            self.stdout.write(result.stdout, ending='')
+
+    def measure(self, options):
+        call_command('migrate', verbosity=0)
+        # Sans cache de rendu, chaque lecture de RaceListView interroge la base
+        catalog.rendered_responses = UncachedResponses()
+        race = self.fixtures(options['races'])
+        writers = [self.writer(race, index) for index in range(options['threads'])]
+        readers = [self.reader() for _ in range(options['threads'])]
+        half = options['threads'] // 2 or 1
+        scenarios = (
+            ('écriture', writers),
+            ('lecture', readers),
+            ('mixte', writers[:half] + readers[:half]),
+        )
+
+        label = settings.SQLITE_PROFILE or 'défaut'
+        for name, requests in scenarios:
+            done, errors, elapsed = self.run(requests, options['seconds'])
+            self.stdout.write(
+                f'{label:<10} {name:<9} {done / elapsed:>10,.1f} requêtes/s {errors:>8,} erreurs  ({len(requests)} threads)'
+            )
+
+    @staticmethod
+    def fixtures(races):
+        start = date(2030, 1, 1)
+        Race.objects.bulk_create(
+            Race(name=f'GP {index}', circuit='Circuit', city='Ville', country='Pays', date=start + timedelta(days=index))
+            for index in range(races)
+        )
+        race = Race.objects.order_by('date').first()
+        driver = Driver.objects.create(name='Pilote', team='Équipe')
+        RaceDriver.objects.create(race=race, driver=driver, winner_odds=Decimal('2.00'))
+        return race
+
+    @staticmethod
+    def writer(race, index):
+        user = User.objects.create_user(
+            email=f'benchmark{index}@example.com', password=None, name=f'Benchmark {index}', balance=Decimal('1000000000.00')
+        )
+        client = APIClient(raise_request_exception=False)
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {refresh_token_for(user).access_token}')
+        payload = {'raceId': race.pk, 'betType': 'winner', 'selection': 'Pilote', 'amount': '1.00', 'odds': '2.00'}
+        return lambda: client.post('/api/bets/place', payload, format='json')
+
+    @staticmethod
+    def reader():
+        client = APIClient(raise_request_exception=False)
+        return lambda: client.get('/api/races')
+
+    @staticmethod
+    def run(requests, seconds):
+        counts = [[0, 0] for _ in requests]
+        deadline = time.perf_counter() + seconds
+
+        def loop(index):
+            request, count = requests[index], counts[index]
+            while time.perf_counter() < deadline:
+                response = request()
+                count[0 if response.status_code < 300 else 1] += 1
+            # Connexion propre au thread (persistante avec le profil de production)
+            connection.close()
+
+        threads = [threading.Thread(target=loop, args=(index,)) for index in range(len(requests))]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+        return sum(done for done, _ in counts), sum(errors for _, errors in counts), elapsed
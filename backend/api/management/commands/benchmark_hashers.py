@@ -0,0 +1,41 @@
+import time
+from importlib.util import find_spec
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password, verify_password
+from django.core.management.base import BaseCommand
+from django.utils.module_loading import import_string
+
+
+class Command(BaseCommand):
+    help = (
+        'Mesure le débit de connexions (vérifications de mot de passe par seconde, sur un cœur) '
+        'de chaque profil de hachage, avec les coûts de PASSWORD_HASHER_COSTS.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seconds', type=float, default=3.0, help='Durée de mesure par profil')
+
+    def handle(self, *args, **options):
+        for profile, path in self.profiles():
+            if profile == 'argon2' and not find_spec('argon2'):
+                self.stdout.write(f'{profile:<8} argon2-cffi non installé : ignoré')
+                continue
+            hasher = import_string(path)()
+            encoded = make_password('mot de passe', hasher=hasher)
+            checks, elapsed = 0, 0.0
+            start = time.perf_counter()
+            # Un seul processus : le débit mesuré est celui d'un cœur
+            while elapsed < options['seconds']:
+                verify_password('mot de passe', encoded, preferred=hasher)
+                checks += 1
+                elapsed = time.perf_counter() - start
+            costs = ', '.join(f'{name}={value}' for name, value in settings.PASSWORD_HASHER_COSTS[profile].items())
+            self.stdout.write(
+                f'{profile:<8} {checks / elapsed:>10,.1f} connexions/s/cœur {elapsed / checks * 1000:>10,.1f} ms  ({costs})'
+            )
+
+    @staticmethod
+    def profiles():
+        for path in settings.PASSWORD_HASHERS:
+            yield import_string(path).profile, path
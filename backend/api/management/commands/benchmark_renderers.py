@@ -0,0 +1,46 @@
+import time
+import uuid
+from datetime import timedelta
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer as StdlibJSONRenderer
+
+from api.renderers import JSONRenderer, MessagePackRenderer
+from api.rows import BET_ROW
+
+
+class Command(BaseCommand):
+    help = "Compare la taille et le temps d'encodage d'une liste de paris selon le renderer."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=20000)
+        parser.add_argument('--repeat', type=int, default=3)
+
+    def handle(self, *args, **options):
+        now = timezone.now()
+        rows = [
+            {
+                'id': uuid.uuid4(), 'user_id': index % 100, 'race_id': 1, 'race__name': 'Grand Prix de Monaco',
+                'bet_type': 'winner', 'selection': 'Pilote', 'amount': Decimal('10.00'), 'odds': Decimal('2.50'),
+                'potential_win': Decimal('25.00'), 'status': 'pending', 'created_at': now - timedelta(seconds=index),
+            }
+            for index in range(options['rows'])
+        ]
+        # Forme réelle de la réponse d'admin/bets
+        data = {'bets': BET_ROW.many(rows), 'next': None}
+
+        candidates = [
+            ('json (stdlib)', StdlibJSONRenderer()),
+            ('orjson', JSONRenderer()),
+            ('msgpack', MessagePackRenderer()),
+        ]
+
+        for label, renderer in candidates:
+            timings = []
+            for _ in range(options['repeat']):
+                start = time.perf_counter()
+                body = renderer.render(data)
+                timings.append(time.perf_counter() - start)
+            self.stdout.write(f'{label:<14} {len(body) / 1024:>10,.0f} Kio {min(timings) * 1000:>10,.1f} ms')
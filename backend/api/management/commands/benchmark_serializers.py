@@ -0,0 +1,67 @@
+import time
+import uuid
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from api.models import Bet, Driver, Race, RaceDriver
+from api.rows import BET_ROW, RACE_DRIVER_ROW
+from api.serializers import BetSerializer, RaceDriverSerializer
+
+
+class Command(BaseCommand):
+    help = 'Compare le débit (lignes/s) des sérialiseurs DRF et des formats values() des listes.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=20000)
+        parser.add_argument('--repeat', type=int, default=3)
+
+    def handle(self, *args, **options):
+        count = options['rows']
+        now = timezone.now()
+        race = Race(pk=1, name='Grand Prix', circuit='Circuit', city='Ville', country='Pays', date=now.date())
+        driver = Driver(pk=1, name='Pilote', team='Équipe', country='FR', flag='🇫🇷', number=1, image='')
+
+        # Mêmes données sous les deux formes, sans base : seul le coût de sérialisation est mesuré
+        bets = [
+            Bet(
+                id=uuid.uuid4(), user_id=index % 100, race=race, bet_type='winner', selection='Pilote',
+                amount=Decimal('10.00'), odds=Decimal('2.50'), potential_win=Decimal('25.00'),
+                status='pending', created_at=now,
+            )
+            for index in range(count)
+        ]
+        bet_rows = [
+            {field: getattr(bet, field) for field in BET_ROW.fields if field != 'race__name'} | {'race__name': race.name}
+            for bet in bets
+        ]
+        entries = [
+            RaceDriver(pk=index, race=race, driver=driver, winner_odds=Decimal('3.00'),
+                       podium_odds=Decimal('1.80'), pole_odds=Decimal('2.40'))
+            for index in range(count)
+        ]
+        entry_rows = [
+            {
+                'id': entry.pk, 'driver_id': driver.pk, 'driver__name': driver.name, 'driver__team': driver.team,
+                'driver__country': driver.country, 'driver__flag': driver.flag, 'driver__number': driver.number,
+                'driver__image': driver.image, 'winner_odds': entry.winner_odds, 'podium_odds': entry.podium_odds,
+                'pole_odds': entry.pole_odds,
+            }
+            for entry in entries
+        ]
+
+        self.report('BetSerializer', count, options['repeat'], lambda: BetSerializer(bets, many=True).data)
+        self.report('BET_ROW', count, options['repeat'], lambda: BET_ROW.many(bet_rows))
+        self.report('RaceDriverSerializer', count, options['repeat'], lambda: RaceDriverSerializer(entries, many=True).data)
+        self.report('RACE_DRIVER_ROW', count, options['repeat'], lambda: RACE_DRIVER_ROW.many(entry_rows))
+
+    def report(self, label, count, repeat, func):
+        best = min(self.timed(func) for _ in range(repeat))
+        self.stdout.write(f'{label:<22} {count / best:>12,.0f} lignes/s')
+
+    @staticmethod
+    def timed(func):
+        start = time.perf_counter()
+        func()
+        return time.perf_counter() - start
@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from api.export import FORMATS, ExportError, export_lines, export_queryset
+
+
+class Command(BaseCommand):
+    help = 'Exporte les paris en CSV ou NDJSON, ligne par ligne, sans les charger tous en mémoire.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--format', choices=sorted(FORMATS), default='csv')
+        parser.add_argument('--from', dest='date_from', metavar='AAAA-MM-JJ', help='Premier jour inclus')
+        parser.add_argument('--to', dest='date_to', metavar='AAAA-MM-JJ', help='Dernier jour inclus')
+        parser.add_argument('--race', help='Identifiant de la course')
+        parser.add_argument('--status', help='pending, won ou lost')
+        parser.add_argument('--output', '-o', help='Fichier de sortie (sortie standard par défaut)')
+
+    def handle(self, *args, **options):
+        try:
+            rows = export_queryset(options['date_from'], options['date_to'], options['race'], options['status'])
+        except ExportError as exc:
+            raise CommandError(str(exc))
+
+        lines = export_lines(rows, options['format'])
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8', newline='') as output:
+                output.writelines(lines)
+        else:
+            for line in lines:
+                self.stdout.write(line, ending='')
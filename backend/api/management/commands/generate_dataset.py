@@ -0,0 +1,311 @@
+import random
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from decimal import Decimal
+from itertools import accumulate
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+
+from api.betting import CENT
+from api.catalog import invalidate_catalog
+from api.imports import (
+    BATCH_SIZE, DRIVER_KEY, RACE_KEY, base_odds_by_name, chunks, driver_rows, entry_odds, upsert,
+)
+from api.models import Bet, Driver, LeaderboardBucket, LeaderboardEntry, Race, RaceDriver, RaceResult, User
+from api.seed_data import DRIVERS_2025, RACES_2025
+
+# (utilisateurs, paris, saisons)
+TIERS = {
+    'small': (1_000, 50_000, 1),
+    'medium': (10_000, 1_000_000, 2),
+    'large': (100_000, 10_000_000, 3),
+}
+BET_TYPES = ['winner', 'podium', 'pole']
+# Poids cumulés : random.choices les accumulerait à chaque tirage
+BET_TYPE_WEIGHTS = list(accumulate([50, 35, 15]))
+STAKES = [Decimal(value) for value in ('5', '10', '20', '25', '50', '100')]
+STAKE_WEIGHTS = list(accumulate([20, 30, 20, 10, 12, 8]))
+MAX_STAKE_SHARE = Decimal('0.02')
+MIN_STAKE = Decimal('1.00')
+START_BALANCE = Decimal('1000.00')
+# Activité relative (Pareto) plafonnée : les plus gros parieurs jouent ~30 fois plus que la moyenne
+MAX_ACTIVITY = 30
+# Utilisateurs générés puis insérés (avec leurs paris et leur classement) par lot
+USERS_PER_BATCH = 1000
+# Paris et cases du classement sont insérés par executemany : bulk_create découpe en
+# requêtes de quelques dizaines de lignes sur SQLite et prépare chaque valeur champ par champ
+ROWS_PER_INSERT = 10_000
+BET_COLUMNS = (
+    'id', 'user_id', 'race_id', 'bet_type', 'selection', 'amount', 'odds', 'potential_win', 'status',
+    'created_at', 'updated_at',
+)
+BUCKET_COLUMNS = ('bucket', 'user_id', 'total_bets', 'total_wins', 'total_losses', 'profit')
+
+
+@contextmanager
+def explicit_timestamps(model, *names):
+    """Let bulk_create keep the given created_at/updated_at values instead of now()."""
+    fields = [model._meta.get_field(name) for name in names]
+    saved = [(field.auto_now, field.auto_now_add) for field in fields]
+    for field in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, (auto_now, auto_now_add) in zip(fields, saved):
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+def insert_statement(model, columns) -> str:
+    quote = connection.ops.quote_name
+    return 'INSERT INTO {} ({}) VALUES ({})'.format(
+        quote(model._meta.db_table),
+        ', '.join(quote(model._meta.get_field(name).column) for name in columns),
+        ', '.join(['%s'] * len(columns)),
+    )
+
+
+class Player:
+    """Bets, final balance and leaderboard totals of one generated player."""
+
+    def __init__(self):
+        self.balance = START_BALANCE
+        self.bets = []
+        self.wins = self.losses = 0
+        self.profit = Decimal('0.00')
+        # clé de case -> [paris, gains, pertes, bénéfice], paris réglés seulement
+        self.buckets = {}
+
+
+class Command(BaseCommand):
+    help = (
+        'Génère un jeu de données synthétique reproductible (utilisateurs, saisons, paris réglés '
+        'et en cours, soldes et classement cohérents) pour les tests de charge et les benchmarks.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tier', choices=sorted(TIERS), default='small')
+        parser.add_argument('--users', type=int, help='Nombre de joueurs (remplace le palier)')
+        parser.add_argument('--bets', type=int, help='Nombre de paris visé (remplace le palier)')
+        parser.add_argument('--seasons', type=int, help='Nombre de saisons (remplace le palier)')
+        parser.add_argument('--seed', type=int, default=2025)
+        parser.add_argument('--prefix', default='loadtest', help='Préfixe des emails générés')
+
+    def handle(self, *args, **options):
+        users, bets, seasons = TIERS[options['tier']]
+        users = options['users'] or users
+        bets = options['bets'] or bets
+        seasons = options['seasons'] or seasons
+        self.prefix = options['prefix']
+        if User.objects.filter(email__startswith=f'{self.prefix}-').exists():
+            raise CommandError(f'Des utilisateurs « {self.prefix}-* » existent déjà (changez --prefix)')
+
+        self.rng = random.Random(options['seed'])
+        # Identifiants déterministes, distincts d'un préfixe à l'autre
+        self.namespace = uuid.uuid5(uuid.NAMESPACE_URL, f"{self.prefix}:{options['seed']}")
+        self.now = timezone.now()
+        self.started = time.monotonic()
+
+        ops = connection.ops
+        self.adapt_uuid = lambda value: Bet._meta.pk.get_db_prep_value(value, connection)
+        self.adapt_datetime = ops.adapt_datetimefield_value
+        self.adapt_decimal = lambda value: ops.adapt_decimalfield_value(value, 14, 2)
+
+        self.create_catalog(seasons)
+        created = self.create_players(users, bets)
+        invalidate_catalog()
+
+        self.stdout.write(self.style.SUCCESS(
+            f'{users} joueurs, {created} paris, {len(self.races)} courses en {self.elapsed()}'
+        ))
+
+    def elapsed(self) -> str:
+        return f'{time.monotonic() - self.started:.0f} s'
+
+    # ---------- Calendrier, pilotes, cotes et résultats ----------
+
+    def create_catalog(self, seasons):
+        base_odds = base_odds_by_name(DRIVERS_2025)
+        # Catalogue importé comme par l'admin : une seconde génération réutilise
+        # les pilotes, les courses et les résultats déjà en base
+        upsert(Driver, driver_rows(DRIVERS_2025), DRIVER_KEY)
+        drivers = list(Driver.objects.filter(name__in=base_odds).order_by('pk'))
+        # Les favoris attirent plus de paris et gagnent plus souvent
+        strength = {driver.name: float(1 / base_odds[driver.name]) for driver in drivers}
+        names = list(strength)
+        weights = [strength[name] for name in names]
+
+        # Calendrier décalé sur la date du jour : la dernière saison générée est la
+        # première qui n'est pas terminée, il reste donc toujours des courses à venir
+        today = timezone.localdate()
+        last = max(data['date'] for data in RACES_2025)
+        current = today.year + (last.replace(year=today.year) < today)
+        calendar = [
+            {**data, 'date': data['date'].replace(year=data['date'].year - last.year + current - offset)}
+            for offset in range(seasons - 1, -1, -1)
+            for data in RACES_2025
+        ]
+        with transaction.atomic():
+            upsert(Race, calendar, RACE_KEY)
+            by_key = {
+                (race.name, race.date): race
+                for race in Race.objects.filter(date__in={data['date'] for data in calendar})
+            }
+            races = [by_key[(data['name'], data['date'])] for data in calendar]
+            RaceDriver.objects.bulk_create(
+                (
+                    RaceDriver(race=race, driver=driver, **dict(zip(('winner_odds', 'podium_odds', 'pole_odds'), entry_odds(base_odds[driver.name]))))
+                    for race in races
+                    for driver in drivers
+                ),
+                batch_size=BATCH_SIZE,
+                update_conflicts=True,
+                unique_fields=['race', 'driver'],
+                update_fields=['winner_odds', 'podium_odds', 'pole_odds'],
+            )
+            settled = {
+                race_id: (order, pole)
+                for race_id, order, pole in RaceResult.objects.filter(race__in=races).values_list(
+                    'race_id', 'finishing_order', 'pole_sitter'
+                )
+            }
+
+            results = []
+            for race in races:
+                # Cotes déjà arrondies, avec leur forme adaptée pour la base
+                race.odds = {
+                    (bet_type, name): (value.quantize(CENT), self.adapt_decimal(value.quantize(CENT)))
+                    for name in names
+                    for bet_type, value in zip(BET_TYPES, entry_odds(base_odds[name]))
+                }
+                race.starts_at = timezone.make_aware(datetime.combine(race.date, datetime.min.time()) + timedelta(hours=14))
+                race.buckets = (LeaderboardBucket.race_key(race.pk), LeaderboardBucket.month_key(race.date))
+                race.winners = None
+                race.settled_at = self.adapt_datetime(race.starts_at + timedelta(hours=3))
+                if race.date < today:
+                    # Tirage fait même pour une course déjà réglée : la suite aléatoire ne dépend pas de la base
+                    order = self.weighted_order(names, weights)
+                    pole = self.rng.choices(names, weights)[0]
+                    if race.pk in settled:
+                        order, pole = settled[race.pk]
+                    else:
+                        results.append(RaceResult(race=race, finishing_order=order, pole_sitter=pole, settled_at=race.starts_at + timedelta(hours=3)))
+                    race.winners = {'winner': {order[0]}, 'podium': set(order[:3]), 'pole': {pole}}
+            RaceResult.objects.bulk_create(results)
+
+        self.races, self.names, self.weights = races, names, list(accumulate(weights))
+        self.stdout.write(f'{len(races)} courses, {len(drivers)} pilotes, {len(results)} résultats')
+
+    def weighted_order(self, names, weights):
+        # Tirage sans remise pondéré : clé exponentielle (Efraimidis-Spirakis)
+        keys = {name: self.rng.random() ** (1 / weight) for name, weight in zip(names, weights)}
+        return sorted(names, key=keys.get, reverse=True)
+
+    # ---------- Joueurs, paris et classement ----------
+
+    def create_players(self, users, bets):
+        # Quelques gros parieurs, beaucoup d'occasionnels
+        activity = [min(self.rng.paretovariate(1.5), MAX_ACTIVITY) for _ in range(users)]
+        scale = bets / sum(activity)
+        password = make_password('password')
+        insert_bet = insert_statement(Bet, BET_COLUMNS)
+        insert_bucket = insert_statement(LeaderboardBucket, BUCKET_COLUMNS)
+
+        created = 0
+        for first in range(0, users, USERS_PER_BATCH):
+            batch = range(first, min(first + USERS_PER_BATCH, users))
+            players, accounts = [], []
+            for index in batch:
+                player = self.player(f'@{self.prefix}-{index}', round(activity[index] * scale))
+                joined = (player.bets[0][-1] if player.bets else self.now) - timedelta(days=self.rng.randint(1, 60))
+                players.append(player)
+                accounts.append(User(
+                    email=f'{self.prefix}-{index}@example.com', name=f'Joueur {index}', password=password,
+                    balance=player.balance, created_at=joined,
+                ))
+
+            with transaction.atomic(), explicit_timestamps(User, 'created_at'):
+                accounts = User.objects.bulk_create(accounts)
+                # Classement tenu pendant la génération : pas de rebuild_leaderboard() à la fin
+                LeaderboardEntry.objects.bulk_create(
+                    LeaderboardEntry(
+                        user_id=account.pk, total_bets=len(player.bets), total_wins=player.wins,
+                        total_losses=player.losses, profit=player.profit,
+                    )
+                    for account, player in zip(accounts, players)
+                )
+                bet_rows = (
+                    (row[0], account.pk, *row[1:-1])
+                    for account, player in zip(accounts, players)
+                    for row in player.bets
+                )
+                bucket_rows = (
+                    (key, account.pk, total_bets, wins, losses, self.adapt_decimal(profit))
+                    for account, player in zip(accounts, players)
+                    for key, (total_bets, wins, losses, profit) in player.buckets.items()
+                )
+                with connection.cursor() as cursor:
+                    for chunk in chunks(bet_rows, ROWS_PER_INSERT):
+                        cursor.executemany(insert_bet, chunk)
+                        created += len(chunk)
+                    for chunk in chunks(bucket_rows, ROWS_PER_INSERT):
+                        cursor.executemany(insert_bucket, chunk)
+            self.stdout.write(f'  {batch.stop}/{users} joueurs, {created} paris ({self.elapsed()})')
+        return created
+
+    def player(self, name, count) -> Player:
+        """Bets of one player in race order, with the balance and standings they leave.
+
+        Stakes are debited when placed and winnings credited when the race is
+        settled, so the final balance is exactly 1000 - stakes + winnings; a
+        player with less than the minimum stake left skips the bet. Bet rows
+        are in `BET_COLUMNS` order without `user_id`, values already adapted
+        for the database; the last item is the placement time (not adapted).
+        """
+        rng = self.rng
+        adapt_uuid, adapt_datetime, adapt_decimal = self.adapt_uuid, self.adapt_datetime, self.adapt_decimal
+        player = Player()
+        for race in sorted(rng.choices(self.races, k=count), key=lambda race: race.date):
+            # Mise usuelle, plafonnée à une fraction du solde : un joueur malchanceux mise
+            # moins au lieu de s'arrêter de jouer
+            cap = max((player.balance * MAX_STAKE_SHARE).quantize(CENT), MIN_STAKE)
+            stake = min(rng.choices(STAKES, cum_weights=STAKE_WEIGHTS)[0], cap)
+            if stake > player.balance:
+                continue
+            bet_type = rng.choices(BET_TYPES, cum_weights=BET_TYPE_WEIGHTS)[0]
+            selection = rng.choices(self.names, cum_weights=self.weights)[0]
+            odds, db_odds = race.odds[(bet_type, selection)]
+            potential_win = (stake * odds).quantize(CENT)
+            placed_at = min(race.starts_at - timedelta(minutes=rng.randint(10, 20_000)), self.now)
+
+            player.balance -= stake
+            bet_status = 'pending'
+            settled_at = adapt_datetime(placed_at)
+            if race.winners is not None:
+                settled_at = race.settled_at
+                if selection in race.winners[bet_type]:
+                    bet_status, won, profit = 'won', 1, potential_win
+                    player.balance += potential_win
+                else:
+                    bet_status, won, profit = 'lost', 0, -stake
+                player.wins += won
+                player.losses += 1 - won
+                player.profit += profit
+                for key in race.buckets:
+                    bucket = player.buckets.setdefault(key, [0, 0, 0, Decimal('0.00')])
+                    bucket[0] += 1
+                    bucket[1] += won
+                    bucket[2] += 1 - won
+                    bucket[3] += profit
+
+            player.bets.append((
+                adapt_uuid(uuid.uuid5(self.namespace, f'{len(player.bets)}{name}')), race.pk, bet_type, selection,
+                adapt_decimal(stake), db_odds, adapt_decimal(potential_win), bet_status,
+                adapt_datetime(placed_at), settled_at, placed_at,
+            ))
+        return player
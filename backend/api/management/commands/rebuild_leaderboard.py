@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from api.leaderboard import rebuild_leaderboard
+
+
+class Command(BaseCommand):
+    help = "Recalcule le classement à partir de l'historique complet des paris."
+
+    def handle(self, *args, **options):
+        rebuild_leaderboard()
+        self.stdout.write(self.style.SUCCESS('Classement recalculé'))
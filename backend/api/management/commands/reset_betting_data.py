@@ -0,0 +1,27 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from api.imports import RESET_CHUNK_SIZE, reset_betting_data
+
+
+class Command(BaseCommand):
+    help = (
+        'Supprime paris, résultats, cotes, courses et pilotes par lots, puis remet les soldes '
+        'à 1000 € et le classement à zéro. Chaque lot est validé : relancer reprend là où '
+        "l'exécution s'est arrêtée."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=RESET_CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+
+        def progress(table, deleted):
+            self.stdout.write(f'  {table} : {deleted} supprimé(s) ({time.monotonic() - started:.1f} s)')
+
+        deleted = reset_betting_data(options['chunk_size'], progress)
+        self.stdout.write(self.style.SUCCESS(
+            f'{sum(deleted.values())} ligne(s) supprimée(s) en {time.monotonic() - started:.1f} s'
+        ))
@@ -0,0 +1,45 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from api.models import Race, RaceResult
+from api.settlement import settle_race
+
+
+class Command(BaseCommand):
+    help = "Enregistre le résultat d'une course et règle tous ses paris en attente."
+
+    def add_arguments(self, parser):
+        parser.add_argument('race_id', type=int)
+        parser.add_argument(
+            '--order',
+            nargs='+',
+            metavar='PILOTE',
+            help="Ordre d'arrivée (noms des pilotes, P1 en premier). Par défaut : résultat déjà enregistré.",
+        )
+        parser.add_argument('--pole', help='Nom du poleman')
+
+    def handle(self, *args, **options):
+        try:
+            race = Race.objects.get(pk=options['race_id'])
+        except Race.DoesNotExist:
+            raise CommandError(f"Course {options['race_id']} introuvable")
+
+        if bool(options['order']) != bool(options['pole']):
+            raise CommandError('--order et --pole doivent être fournis ensemble')
+
+        with transaction.atomic():
+            result = RaceResult.objects.filter(race=race).first()
+            if options['order']:
+                result = result or RaceResult(race=race)
+                result.finishing_order = options['order']
+                result.pole_sitter = options['pole']
+                result.save()
+            elif result is None:
+                raise CommandError(f'Aucun résultat enregistré pour {race.name} (utilisez --order et --pole)')
+
+            summary = settle_race(result)
+        self.stdout.write(self.style.SUCCESS(
+            f"{race.name} : {summary['settled']} paris réglés "
+            f"({summary['won']} gagnés, {summary['lost']} perdus), "
+            f"{summary['totalPayout']:.2f} € versés"
+        ))
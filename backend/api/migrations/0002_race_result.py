@@ -0,0 +1,26 @@
+# Generated by Django 5.1.3 on 2026-10-18 11:11
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RaceResult',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('finishing_order', models.JSONField(default=list)),
+                ('pole_sitter', models.CharField(max_length=150)),
+                ('settled_at', models.DateTimeField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('race', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='result', to='api.race')),
+            ],
+        ),
+    ]
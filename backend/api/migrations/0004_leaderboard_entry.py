@@ -0,0 +1,53 @@
+# Generated by Django 5.1.3 on 2026-10-18 11:17
+
+import django.db.models.deletion
+from decimal import Decimal
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Q, Sum
+
+
+def backfill_leaderboard(apps, schema_editor):
+    User = apps.get_model('api', 'User')
+    Bet = apps.get_model('api', 'Bet')
+    LeaderboardEntry = apps.get_model('api', 'LeaderboardEntry')
+
+    entries = {pk: LeaderboardEntry(user_id=pk) for pk in User.objects.values_list('pk', flat=True)}
+    rows = Bet.objects.values('user_id').annotate(
+        total=Count('pk'),
+        wins=Count('pk', filter=Q(status='won')),
+        losses=Count('pk', filter=Q(status='lost')),
+        won_amount=Sum('potential_win', filter=Q(status='won')),
+        lost_amount=Sum('amount', filter=Q(status='lost')),
+    )
+    for row in rows:
+        entry = entries[row['user_id']]
+        entry.total_bets = row['total']
+        entry.total_wins = row['wins']
+        entry.total_losses = row['losses']
+        entry.profit = (row['won_amount'] or Decimal('0.00')) - (row['lost_amount'] or Decimal('0.00'))
+    LeaderboardEntry.objects.bulk_create(entries.values(), batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0003_idempotency_key'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LeaderboardEntry',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='leaderboard_entry', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('total_bets', models.PositiveIntegerField(default=0)),
+                ('total_wins', models.PositiveIntegerField(default=0)),
+                ('total_losses', models.PositiveIntegerField(default=0)),
+                ('profit', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=14)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['-profit', 'user'], name='leaderboard_rank_idx')],
+            },
+        ),
+        migrations.RunPython(backfill_leaderboard, migrations.RunPython.noop),
+    ]
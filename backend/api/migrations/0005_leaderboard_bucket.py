@@ -0,0 +1,57 @@
+# Generated by Django 5.1.3 on 2026-10-18 11:20
+
+import django.db.models.deletion
+from decimal import Decimal
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Q, Sum
+
+
+def backfill_buckets(apps, schema_editor):
+    Bet = apps.get_model('api', 'Bet')
+    LeaderboardBucket = apps.get_model('api', 'LeaderboardBucket')
+
+    rows = Bet.objects.filter(status__in=['won', 'lost']).values('user_id', 'race_id', 'race__date').annotate(
+        wins=Count('pk', filter=Q(status='won')),
+        losses=Count('pk', filter=Q(status='lost')),
+        won_amount=Sum('potential_win', filter=Q(status='won')),
+        lost_amount=Sum('amount', filter=Q(status='lost')),
+    ).order_by()
+
+    totals = {}
+    for row in rows:
+        profit = (row['won_amount'] or Decimal('0.00')) - (row['lost_amount'] or Decimal('0.00'))
+        for key in (f"race:{row['race_id']}", f"month:{row['race__date']:%Y-%m}"):
+            bucket = totals.setdefault((key, row['user_id']), LeaderboardBucket(bucket=key, user_id=row['user_id']))
+            bucket.total_bets += row['wins'] + row['losses']
+            bucket.total_wins += row['wins']
+            bucket.total_losses += row['losses']
+            bucket.profit += profit
+    LeaderboardBucket.objects.bulk_create(totals.values(), batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0004_leaderboard_entry'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LeaderboardBucket',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('bucket', models.CharField(max_length=32)),
+                ('total_bets', models.PositiveIntegerField(default=0)),
+                ('total_wins', models.PositiveIntegerField(default=0)),
+                ('total_losses', models.PositiveIntegerField(default=0)),
+                ('profit', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=14)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='leaderboard_buckets', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['bucket', '-profit', 'user'], name='leaderboard_bucket_rank_idx')],
+                'unique_together': {('bucket', 'user')},
+            },
+        ),
+        migrations.RunPython(backfill_buckets, migrations.RunPython.noop),
+    ]
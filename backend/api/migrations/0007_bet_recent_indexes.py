@@ -0,0 +1,21 @@
+# Generated by Django 5.1.3 on 2026-10-18 11:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0006_catalog_change_stamps'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='bet',
+            index=models.Index(fields=['-created_at', '-id'], name='bet_recent_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='bet',
+            index=models.Index(fields=['user', '-created_at', '-id'], name='bet_user_recent_idx'),
+        ),
+    ]
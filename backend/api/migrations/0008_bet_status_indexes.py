@@ -0,0 +1,21 @@
+# Generated by Django 5.1.3 on 2026-10-18 12:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0007_bet_recent_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='bet',
+            index=models.Index(fields=['user', 'status', '-potential_win'], name='bet_user_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='bet',
+            index=models.Index(fields=['status', 'race', 'user'], name='bet_status_race_idx'),
+        ),
+    ]
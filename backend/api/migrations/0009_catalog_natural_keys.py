@@ -0,0 +1,87 @@
+# Generated by Django 5.1.3 on 2026-10-18 12:30
+
+from django.db import migrations, models
+
+
+def duplicates(model, key):
+    """(kept row, [duplicate rows]) for each value of `key` held by several rows; the oldest row is kept."""
+    values = (
+        model.objects.values(*key)
+        .annotate(count=models.Count('pk'))
+        .filter(count__gt=1)
+        .values_list(*key)
+    )
+    for value in values:
+        rows = list(model.objects.filter(**dict(zip(key, value))).order_by('pk'))
+        yield rows[0], rows[1:]
+
+
+def move_entries(RaceDriver, field, kept, duplicate):
+    """Reattach the entries of `duplicate` to `kept`, dropping those `kept` already has."""
+    other = 'driver_id' if field == 'race' else 'race_id'
+    taken = set(RaceDriver.objects.filter(**{field: kept}).values_list(other, flat=True))
+    entries = RaceDriver.objects.filter(**{field: duplicate})
+    entries.filter(**{f'{other}__in': taken}).delete()
+    entries.update(**{field: kept})
+
+
+def merge_duplicates(apps, schema_editor):
+    # Les vues d'administration permettaient de créer des doublons : on les fusionne
+    # avant de poser les contraintes d'unicité
+    Driver = apps.get_model('api', 'Driver')
+    Race = apps.get_model('api', 'Race')
+    RaceDriver = apps.get_model('api', 'RaceDriver')
+    RaceResult = apps.get_model('api', 'RaceResult')
+    Bet = apps.get_model('api', 'Bet')
+    LeaderboardBucket = apps.get_model('api', 'LeaderboardBucket')
+
+    # Les paris désignent les pilotes par leur nom : seuls les engagements sont à rattacher
+    for kept, duplicate_drivers in duplicates(Driver, ('name',)):
+        for duplicate in duplicate_drivers:
+            move_entries(RaceDriver, 'driver', kept, duplicate)
+            duplicate.delete()
+
+    for kept, duplicate_races in duplicates(Race, ('name', 'date')):
+        kept_bucket = f'race:{kept.pk}'
+        for duplicate in duplicate_races:
+            Bet.objects.filter(race=duplicate).update(race=kept)
+            move_entries(RaceDriver, 'race', kept, duplicate)
+            # Le résultat de la course conservée fait foi ; les paris déjà réglés gardent leur statut
+            if RaceResult.objects.filter(race=kept).exists():
+                RaceResult.objects.filter(race=duplicate).delete()
+            else:
+                RaceResult.objects.filter(race=duplicate).update(race=kept)
+
+            for bucket in LeaderboardBucket.objects.filter(bucket=f'race:{duplicate.pk}'):
+                merged = LeaderboardBucket.objects.filter(bucket=kept_bucket, user_id=bucket.user_id).update(
+                    total_bets=models.F('total_bets') + bucket.total_bets,
+                    total_wins=models.F('total_wins') + bucket.total_wins,
+                    total_losses=models.F('total_losses') + bucket.total_losses,
+                    profit=models.F('profit') + bucket.profit,
+                )
+                if merged:
+                    bucket.delete()
+                else:
+                    bucket.bucket = kept_bucket
+                    bucket.save(update_fields=['bucket'])
+            duplicate.delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0008_bet_status_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicates, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='driver',
+            name='name',
+            field=models.CharField(max_length=150, unique=True),
+        ),
+        migrations.AlterUniqueTogether(
+            name='race',
+            unique_together={('name', 'date')},
+        ),
+    ]
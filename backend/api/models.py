@@ -3,18 +3,23 @@ from decimal import Decimal
 
 from django.contrib.auth.models import AbstractUser, BaseUserManager
 from django.db import models
+from django.db.models import F
+from django.db.models.functions import Coalesce
 
 
 class UserManager(BaseUserManager):
     """Custom user manager that relies on the email field."""
 
-    def create_user(self, email, password=None, **extra_fields):
+    def create_user(self, email, password=None, *, password_hash=None, **extra_fields):
+        """Create a user; `password_hash` is an already hashed password (see `api.hashers`)."""
         if not email:
             raise ValueError("L'adresse email est obligatoire")
         email = self.normalize_email(email)
         extra_fields.setdefault("name", "")
         user = self.model(email=email, **extra_fields)
-        if password:
+        if password_hash:
+            user.password = password_hash
+        elif password:
             user.set_password(password)
         else:
             user.set_unusable_password()
@@ -33,6 +38,14 @@ class UserManager(BaseUserManager):
 
         return self.create_user(email, password, **extra_fields)
 
+    def with_bet_totals(self):
+        """Users annotated with `total_bets`, `total_wins` and `total_losses` from their leaderboard entry."""
+        return self.get_queryset().annotate(
+            total_bets=Coalesce(F("leaderboard_entry__total_bets"), 0),
+            total_wins=Coalesce(F("leaderboard_entry__total_wins"), 0),
+            total_losses=Coalesce(F("leaderboard_entry__total_losses"), 0),
+        )
+
 
 class User(AbstractUser):
     """User model tailored for the betting platform."""
@@ -48,6 +61,8 @@ class User(AbstractUser):
     balance = models.DecimalField(max_digits=12, decimal_places=2, default=Decimal("1000.00"))
     role = models.CharField(max_length=20, choices=USER_ROLE_CHOICES, default="user")
     banned = models.BooleanField(default=False)
+    # Incrémenté à chaque changement de rôle ou bannissement : invalide les jetons émis avant
+    auth_version = models.PositiveIntegerField(default=0)
     created_at = models.DateTimeField(auto_now_add=True)
 
     objects = UserManager()
@@ -60,13 +75,15 @@ class User(AbstractUser):
 
 
 class Driver(models.Model):
-    name = models.CharField(max_length=150)
+    name = models.CharField(max_length=150, unique=True)
     team = models.CharField(max_length=150)
     country = models.CharField(max_length=100, blank=True)
     flag = models.CharField(max_length=8, blank=True)
     number = models.PositiveIntegerField(default=0)
     image = models.URLField(blank=True)
 
+    updated_at = models.DateTimeField(auto_now=True)
+
     def __str__(self):
         return self.name
 
@@ -85,6 +102,10 @@ class Race(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        # Clé naturelle des imports du calendrier
+        unique_together = ("name", "date")
+
     def __str__(self):
         return self.name
 
@@ -96,6 +117,8 @@ class RaceDriver(models.Model):
     podium_odds = models.DecimalField(max_digits=6, decimal_places=2, default=Decimal("0.00"))
     pole_odds = models.DecimalField(max_digits=6, decimal_places=2, default=Decimal("0.00"))
 
+    updated_at = models.DateTimeField(auto_now=True)
+
     class Meta:
         unique_together = ("race", "driver")
 
@@ -103,6 +126,30 @@ class RaceDriver(models.Model):
         return f"{self.driver.name} @ {self.race.name}"
 
 
+class RaceResult(models.Model):
+    """Official classification of a race, used to settle its pending bets."""
+
+    race = models.OneToOneField(Race, on_delete=models.CASCADE, related_name="result")
+    # Noms des pilotes dans l'ordre d'arrivée (P1 en premier), comme `Bet.selection`
+    finishing_order = models.JSONField(default=list)
+    pole_sitter = models.CharField(max_length=150)
+    settled_at = models.DateTimeField(null=True, blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    @property
+    def winner(self):
+        return self.finishing_order[0] if self.finishing_order else None
+
+    @property
+    def podium(self):
+        return list(self.finishing_order[:3])
+
+    def __str__(self):
+        return f"Résultat {self.race.name}"
+
+
 class Bet(models.Model):
     BET_TYPE_CHOICES = [
         ("winner", "Vainqueur"),
@@ -128,9 +175,96 @@ class Bet(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            # Pagination par curseur (created_at, id), du plus récent au plus ancien
+            models.Index(fields=["-created_at", "-id"], name="bet_recent_idx"),
+            models.Index(fields=["user", "-created_at", "-id"], name="bet_user_recent_idx"),
+            # Statistiques par joueur et meilleur gain
+            models.Index(fields=["user", "status", "-potential_win"], name="bet_user_status_idx"),
+            # Paris en cours : compteur de l'admin, règlement d'une course et ses parieurs
+            models.Index(fields=["status", "race", "user"], name="bet_status_race_idx"),
+        ]
+
     def save(self, *args, **kwargs):
         self.potential_win = Decimal(self.amount) * Decimal(self.odds)
         super().save(*args, **kwargs)
 
     def __str__(self):
         return f"{self.user.email} - {self.selection} ({self.bet_type})"
+
+
+class LeaderboardEntry(models.Model):
+    """Betting totals of a user, maintained incrementally when bets are placed and settled."""
+
+    user = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True, related_name="leaderboard_entry")
+    total_bets = models.PositiveIntegerField(default=0)
+    total_wins = models.PositiveIntegerField(default=0)
+    total_losses = models.PositiveIntegerField(default=0)
+    # Gains des paris gagnés moins les mises des paris perdus
+    profit = models.DecimalField(max_digits=14, decimal_places=2, default=Decimal("0.00"))
+
+    class Meta:
+        indexes = [models.Index(fields=["-profit", "user"], name="leaderboard_rank_idx")]
+
+    def __str__(self):
+        return f"{self.user_id}: {self.profit}"
+
+
+class LeaderboardBucket(models.Model):
+    """Settled-bet totals of a user within one race or one calendar month.
+
+    `bucket` is "race:<race id>" or "month:<YYYY-MM>" (month of the race date).
+    """
+
+    bucket = models.CharField(max_length=32)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="leaderboard_buckets")
+    total_bets = models.PositiveIntegerField(default=0)
+    total_wins = models.PositiveIntegerField(default=0)
+    total_losses = models.PositiveIntegerField(default=0)
+    profit = models.DecimalField(max_digits=14, decimal_places=2, default=Decimal("0.00"))
+
+    class Meta:
+        unique_together = ("bucket", "user")
+        indexes = [models.Index(fields=["bucket", "-profit", "user"], name="leaderboard_bucket_rank_idx")]
+
+    @staticmethod
+    def race_key(race_id):
+        return f"race:{race_id}"
+
+    @staticmethod
+    def month_key(day):
+        return f"month:{day:%Y-%m}"
+
+    def __str__(self):
+        return f"{self.bucket} {self.user_id}: {self.profit}"
+
+
+class IdempotencyKey(models.Model):
+    """Response stored for an `Idempotency-Key` header, replayed on client retries."""
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="idempotency_keys")
+    key = models.CharField(max_length=255)
+    fingerprint = models.CharField(max_length=64)
+    status_code = models.PositiveSmallIntegerField()
+    response = models.JSONField()
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        unique_together = ("user", "key")
+
+    def __str__(self):
+        return f"{self.user_id}:{self.key}"
+
+
+class RevokedToken(models.Model):
+    """JWT revoked before its expiry (logout), identified by its `jti` claim."""
+
+    jti = models.CharField(max_length=255, unique=True)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="revoked_tokens")
+    # Expiration du jeton : la ligne est inutile au-delà
+    expires_at = models.DateTimeField(db_index=True)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    def __str__(self):
+        return f"{self.user_id}:{self.jti}"
@@ -0,0 +1,52 @@
+import threading
+from decimal import Decimal
+from typing import Dict, Optional, Tuple
+
+from .catalog import catalog_version
+from .models import RaceDriver
+
+ODDS_FIELDS = {
+    'winner': 'winner_odds',
+    'podium': 'podium_odds',
+    'pole': 'pole_odds',
+}
+
+OddsKey = Tuple[int, str, str]
+
+
+class OddsIndex:
+    """Per-worker map of (race id, driver name, bet type) -> current odds.
+
+    The whole `RaceDriver` table is loaded once and kept in memory. The
+    catalog version tells every worker when the odds changed (within
+    `CATALOG_VERSION_REFRESH` for a change made by another worker, see
+    `catalog_version()`); a lookup only compares that version with the one it
+    was built from, so bet placement reads the authoritative odds without
+    touching the database between two checks.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._version: Optional[str] = None
+        self._odds: Dict[OddsKey, Decimal] = {}
+
+    def get(self, race_id: int, selection: str, bet_type: str) -> Optional[Decimal]:
+        version = catalog_version()
+        if version != self._version:
+            self._load(version)
+        return self._odds.get((int(race_id), selection, bet_type))
+
+    def _load(self, version: str) -> None:
+        with self._lock:
+            if version == self._version:
+                return
+            odds = {}
+            rows = RaceDriver.objects.values_list('race_id', 'driver__name', *ODDS_FIELDS.values())
+            for race_id, name, *values in rows.iterator(chunk_size=2000):
+                for bet_type, value in zip(ODDS_FIELDS, values):
+                    odds[(race_id, name, bet_type)] = value
+            self._odds = odds
+            self._version = version
+
+
+odds_index = OddsIndex()
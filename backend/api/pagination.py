@@ -0,0 +1,72 @@
+import base64
+import json
+import uuid
+from typing import Any, List, Optional, Tuple
+
+from django.db.models import Q, QuerySet
+from django.utils.dateparse import parse_datetime
+
+
+def limit_offset(request, default_limit: int, max_limit: int) -> Tuple[int, int]:
+    """Read `?limit=&offset=` from the query string, clamped to sane bounds."""
+    try:
+        limit = int(request.query_params.get('limit', default_limit))
+    except (TypeError, ValueError):
+        limit = default_limit
+    try:
+        offset = int(request.query_params.get('offset', 0))
+    except (TypeError, ValueError):
+        offset = 0
+    return min(max(limit, 1), max_limit), max(offset, 0)
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(created_at, pk) -> str:
+    raw = json.dumps([created_at.isoformat(), str(pk)], separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor: str) -> Tuple[Any, uuid.UUID]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        created_at, pk = json.loads(raw)
+        created_at = parse_datetime(created_at)
+        # Clés UUID (paris) : une valeur invalide est refusée ici, pas par la requête
+        pk = uuid.UUID(pk)
+    except (AttributeError, TypeError, ValueError):
+        raise InvalidCursor(cursor)
+    if created_at is None:
+        raise InvalidCursor(cursor)
+    return created_at, pk
+
+
+def newest_first(request, queryset: QuerySet, default_limit: int, max_limit: int) -> Tuple[List[Any], Optional[str]]:
+    """One page of `queryset` ordered by (-created_at, -id), and the cursor of the next one.
+
+    The opaque `?cursor=` holds the (created_at, id) of the last row already
+    returned, so every page is a range scan on a (created_at, id) index
+    whatever its depth; `?limit=` is clamped like `limit_offset`. Raises
+    `InvalidCursor` when the cursor cannot be decoded.
+    """
+    limit, _ = limit_offset(request, default_limit, max_limit)
+    queryset = queryset.order_by('-created_at', '-id')
+
+    cursor = request.query_params.get('cursor')
+    if cursor:
+        created_at, pk = decode_cursor(cursor)
+        # Forme « <= puis départage » plutôt qu'un OR : l'index reste parcouru dans l'ordre
+        queryset = queryset.filter(Q(created_at__lte=created_at), Q(created_at__lt=created_at) | Q(id__lt=pk))
+
+    # Une ligne de plus pour savoir s'il reste une page, sans COUNT
+    rows = list(queryset[:limit + 1])
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    last = rows[-1]
+    if isinstance(last, dict):
+        # Lignes values() du chemin rapide
+        return rows, encode_cursor(last['created_at'], last['id'])
+    return rows, encode_cursor(last.created_at, last.pk)
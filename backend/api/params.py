@@ -0,0 +1,15 @@
+from typing import Any, Optional
+
+# Clés primaires : entiers signés de 64 bits (BigAutoField, entiers SQLite)
+MAX_ID = 2 ** 63 - 1
+
+
+def parse_id(value: Any) -> Optional[int]:
+    """`value` as a primary key, or None when it is not an integer the database can compare."""
+    if isinstance(value, bool):
+        return None
+    try:
+        number = int(value)
+    except (TypeError, ValueError):
+        return None
+    return number if -MAX_ID - 1 <= number <= MAX_ID else None
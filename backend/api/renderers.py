@@ -0,0 +1,56 @@
+import orjson
+import msgpack
+from rest_framework import parsers, renderers
+from rest_framework.exceptions import ParseError
+from rest_framework.utils.encoders import JSONEncoder
+
+# Types que ni orjson ni msgpack ne connaissent (Decimal, lazy strings, QuerySet…) :
+# même conversion que l'encodeur de DRF
+_default = JSONEncoder().default
+
+ORJSON_OPTIONS = orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS
+
+
+class JSONRenderer(renderers.JSONRenderer):
+    """DRF's JSONRenderer on orjson, with the same output for the API's data.
+
+    Datetimes, dates and UUIDs are encoded natively (UTC as `Z`, like DRF);
+    Decimal and the other types go through DRF's encoder. Indented output,
+    requested by the browsable API, still uses the stdlib encoder.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        if self.get_indent(accepted_media_type, renderer_context or {}):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        ret = orjson.dumps(data, default=_default, option=ORJSON_OPTIONS)
+        # Comme DRF : U+2028 / U+2029 échappés pour rester valides dans du JavaScript
+        if b'\xe2\x80\xa8' in ret or b'\xe2\x80\xa9' in ret:
+            ret = ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+        return ret
+
+
+class JSONParser(parsers.JSONParser):
+    renderer_class = JSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        try:
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as exc:
+            raise ParseError(f'JSON parse error - {exc}')
+
+
+class MessagePackRenderer(renderers.BaseRenderer):
+    """Compact binary representation for clients sending `Accept: application/msgpack`."""
+
+    media_type = 'application/msgpack'
+    format = 'msgpack'
+    charset = None
+    render_style = 'binary'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return msgpack.packb(data, default=_default, use_bin_type=True)
@@ -0,0 +1,146 @@
+import hashlib
+import math
+import threading
+import time
+from datetime import datetime, timedelta, timezone as dt_timezone
+from typing import Iterable, Optional
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from rest_framework_simplejwt.settings import api_settings
+
+from .models import RevokedToken
+from .worker import Every
+
+# Lignes relues à chaque rafraîchissement incrémental : une révocation dont la
+# transaction a validé après le précédent rafraîchissement n'est pas manquée
+REFRESH_OVERLAP = timedelta(minutes=1)
+# Chaque worker purge les révocations expirées toutes les PURGE_EVERY révocations
+PURGE_EVERY = 1000
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter of strings: no false negatives, ~`error_rate` false positives."""
+
+    def __init__(self, capacity: int, error_rate: float):
+        self.size = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, item: str):
+        # Double hachage (Kirsch-Mitzenmacher) : deux entiers de 64 bits suffisent pour k positions
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        first, second = int.from_bytes(digest[:8], 'little'), int.from_bytes(digest[8:], 'little') | 1
+        return ((first + index * second) % self.size for index in range(self.hashes))
+
+    def add(self, item: str) -> None:
+        for position in self._positions(item):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, item: str) -> bool:
+        bits = self.bits
+        return all(bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+
+class RevocationList:
+    """Per-worker view of the `RevokedToken` table, answered from a Bloom filter.
+
+    Every `TOKEN_REVOCATION_REFRESH` at most, the worker adds the rows created
+    since its previous refresh to the filter (one query on the `created_at`
+    index), so it sees the logouts handled by other workers whether or not
+    the cache is shared. The filter is
+    rebuilt from the unexpired rows every `TOKEN_REVOCATION_REBUILD` (expired
+    tokens cannot be removed from it) or when it outgrows its capacity. Only
+    filter hits are confirmed by a query.
+    """
+
+    def __init__(self, capacity: int, error_rate: float, refresh: float, rebuild: float):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.refresh_every = refresh
+        self.rebuild_every = rebuild
+        self._lock = threading.Lock()
+        self._filter: Optional[BloomFilter] = None
+        self._checked_at = self._rebuilt_at = 0.0
+        self._since: Optional[datetime] = None
+
+    def is_revoked(self, jti: str) -> bool:
+        self.refresh()
+        if jti not in self._filter:
+            return False
+        return RevokedToken.objects.filter(jti=jti).exists()
+
+    def add(self, jti: str) -> None:
+        """Make a revocation by this worker visible to it immediately."""
+        self.refresh()
+        with self._lock:
+            self._filter.add(jti)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._filter = None
+
+    def refresh(self) -> None:
+        now = time.monotonic()
+        if self._filter is not None and now - self._checked_at < self.refresh_every:
+            return
+        with self._lock:
+            if self._filter is not None and now - self._checked_at < self.refresh_every:
+                return
+            self._checked_at = now
+            started = timezone.now()
+            if (
+                self._filter is None
+                or now - self._rebuilt_at >= self.rebuild_every
+                or self._filter.count > self.capacity
+            ):
+                jtis = list(RevokedToken.objects.filter(expires_at__gt=started).values_list('jti', flat=True))
+                self._filter = BloomFilter(max(self.capacity, 2 * len(jtis)), self.error_rate)
+                self._rebuilt_at = now
+            else:
+                rows = RevokedToken.objects.filter(created_at__gte=self._since - REFRESH_OVERLAP)
+                jtis = rows.values_list('jti', flat=True)
+            for jti in jtis:
+                # Les lignes relues (REFRESH_OVERLAP) ne comptent pas deux fois
+                if jti not in self._filter:
+                    self._filter.add(jti)
+            self._since = started
+
+
+revocations = RevocationList(
+    capacity=settings.TOKEN_REVOCATION_CAPACITY,
+    error_rate=settings.TOKEN_REVOCATION_ERROR_RATE,
+    refresh=settings.TOKEN_REVOCATION_REFRESH.total_seconds(),
+    rebuild=settings.TOKEN_REVOCATION_REBUILD.total_seconds(),
+)
+
+
+_purge = Every(PURGE_EVERY)
+
+
+def purge_expired_revocations() -> int:
+    """Delete the revocations of tokens that have expired anyway."""
+    deleted, _ = RevokedToken.objects.filter(expires_at__lt=timezone.now()).delete()
+    return deleted
+
+
+def revoke(tokens: Iterable) -> None:
+    """Revoke validated simplejwt tokens (access or refresh) until they expire."""
+    for token in tokens:
+        jti = token[api_settings.JTI_CLAIM]
+        try:
+            with transaction.atomic():
+                RevokedToken.objects.create(
+                    jti=jti,
+                    user_id=token[api_settings.USER_ID_CLAIM],
+                    expires_at=datetime.fromtimestamp(token['exp'], tz=dt_timezone.utc),
+                )
+        except IntegrityError:
+            # Déjà révoqué
+            continue
+        revocations.add(jti)
+        if _purge.tick():
+            purge_expired_revocations()
@@ -0,0 +1,112 @@
+from operator import itemgetter
+from typing import Any, Callable, Dict, List, NamedTuple, Sequence, Tuple
+
+from django.db.models import QuerySet
+from rest_framework import serializers
+
+
+class Computed(NamedTuple):
+    """Column computed from several fields of the row: `func(row)`."""
+
+    func: Callable[[Dict[str, Any]], Any]
+    fields: Tuple[str, ...]
+
+
+class RowFormat:
+    """Read-only list serialization from `values()` rows.
+
+    `columns` lists (output key, source) pairs in output order; a source is a
+    field name, a (field name, converter) pair, a `Computed`, or a nested
+    column list rendered as a sub-dict. The mapping is resolved once into a
+    tuple of (output key, getter) pairs, so a row costs one dict
+    comprehension instead of a pass through the DRF field machinery. Each
+    format mirrors one serializer and must produce exactly the same output.
+    """
+
+    def __init__(self, columns: Sequence[Tuple[str, Any]]):
+        self._fields: Dict[str, None] = {}
+        self.to_dict: Callable[[Dict[str, Any]], Dict[str, Any]] = self._build(columns)
+        self.fields = tuple(self._fields)
+
+    def _build(self, columns) -> Callable[[Dict[str, Any]], Dict[str, Any]]:
+        getters = tuple((key, self._getter(source)) for key, source in columns)
+        return lambda row: {key: get(row) for key, get in getters}
+
+    def _getter(self, source) -> Callable[[Dict[str, Any]], Any]:
+        if isinstance(source, str):
+            self._fields[source] = None
+            return itemgetter(source)
+        if isinstance(source, Computed):
+            self._fields.update(dict.fromkeys(source.fields))
+            return source.func
+        if isinstance(source, tuple):
+            field, convert = source
+            self._fields[field] = None
+            return lambda row: convert(row[field])
+        return self._build(source)
+
+    def rows(self, queryset: QuerySet) -> QuerySet:
+        """`queryset` as plain dict rows carrying every field the format reads."""
+        return queryset.values(*self.fields)
+
+    def many(self, rows) -> List[Dict[str, Any]]:
+        to_dict = self.to_dict
+        return [to_dict(row) for row in rows]
+
+
+# Même représentation que le DateTimeField DRF des sérialiseurs
+datetime_repr = serializers.DateTimeField().to_representation
+
+
+def win_rate(row: Dict[str, Any]) -> float:
+    if row['total_bets'] == 0:
+        return 0.0
+    return round((row['total_wins'] / row['total_bets']) * 100, 2)
+
+
+# BetSerializer
+BET_ROW = RowFormat([
+    ('id', ('id', str)),
+    ('userId', 'user_id'),
+    ('race', 'race_id'),
+    ('raceName', 'race__name'),
+    ('betType', 'bet_type'),
+    ('selection', 'selection'),
+    ('amount', ('amount', float)),
+    ('odds', ('odds', float)),
+    ('potentialWin', ('potential_win', float)),
+    ('status', 'status'),
+    ('placedAt', ('created_at', datetime_repr)),
+])
+
+# RaceDriverSerializer
+RACE_DRIVER_ROW = RowFormat([
+    ('id', 'id'),
+    ('driver', [
+        ('id', 'driver_id'),
+        ('name', 'driver__name'),
+        ('team', 'driver__team'),
+        ('country', 'driver__country'),
+        ('flag', 'driver__flag'),
+        ('number', 'driver__number'),
+        ('image', 'driver__image'),
+    ]),
+    ('winnerOdds', ('winner_odds', float)),
+    ('podiumOdds', ('podium_odds', float)),
+    ('poleOdds', ('pole_odds', float)),
+])
+
+# UserSerializer, sur User.objects.with_bet_totals()
+USER_ROW = RowFormat([
+    ('id', 'id'),
+    ('email', 'email'),
+    ('name', 'name'),
+    ('balance', ('balance', float)),
+    ('role', 'role'),
+    ('banned', 'banned'),
+    ('totalBets', 'total_bets'),
+    ('totalWins', 'total_wins'),
+    ('totalLosses', 'total_losses'),
+    ('winRate', Computed(win_rate, ('total_bets', 'total_wins'))),
+    ('createdAt', ('created_at', datetime_repr)),
+])
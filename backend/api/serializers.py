@@ -2,7 +2,7 @@ from decimal import Decimal
 
 from rest_framework import serializers
 
-from .models import Bet, Driver, Race, RaceDriver, User
+from .models import Bet, Driver, LeaderboardEntry, Race, RaceDriver, RaceResult, User
 
 
 class DriverSerializer(serializers.ModelSerializer):
@@ -48,6 +48,17 @@ class RaceDriverSerializer(serializers.ModelSerializer):
         return float(obj.pole_odds)
 
 
+class RaceResultSerializer(serializers.ModelSerializer):
+    finishingOrder = serializers.ListField(source='finishing_order', child=serializers.CharField(), allow_empty=False)
+    poleSitter = serializers.CharField(source='pole_sitter')
+    settledAt = serializers.DateTimeField(source='settled_at', read_only=True)
+
+    class Meta:
+        model = RaceResult
+        fields = ('race', 'finishingOrder', 'poleSitter', 'settledAt')
+        read_only_fields = ('race',)
+
+
 class BetSerializer(serializers.ModelSerializer):
     betType = serializers.CharField(source='bet_type')
     placedAt = serializers.DateTimeField(source='created_at')
@@ -107,20 +118,29 @@ class UserSerializer(serializers.ModelSerializer):
             'createdAt',
         )
 
+    def _bet_totals(self, obj: User):
+        # Les vues de liste fournissent ces totaux via User.objects.with_bet_totals()
+        if not hasattr(obj, 'total_bets'):
+            entry = LeaderboardEntry.objects.filter(user_id=obj.pk).first()
+            obj.total_bets = entry.total_bets if entry else 0
+            obj.total_wins = entry.total_wins if entry else 0
+            obj.total_losses = entry.total_losses if entry else 0
+        return obj.total_bets, obj.total_wins, obj.total_losses
+
     def get_totalBets(self, obj: User) -> int:
-        return obj.bets.count()
+        return self._bet_totals(obj)[0]
 
     def get_totalWins(self, obj: User) -> int:
-        return obj.bets.filter(status='won').count()
+        return self._bet_totals(obj)[1]
 
     def get_totalLosses(self, obj: User) -> int:
-        return obj.bets.filter(status='lost').count()
+        return self._bet_totals(obj)[2]
 
     def get_winRate(self, obj: User) -> float:
-        total = obj.bets.count()
+        total, wins, _ = self._bet_totals(obj)
         if total == 0:
             return 0.0
-        return round((obj.bets.filter(status='won').count() / total) * 100, 2)
+        return round((wins / total) * 100, 2)
 
     def to_representation(self, instance):
         data = super().to_representation(instance)
@@ -141,6 +161,7 @@ class UserStatsSerializer(serializers.Serializer):
 
 
 class LeaderboardEntrySerializer(serializers.Serializer):
+    rank = serializers.IntegerField()
     id = serializers.IntegerField()
     name = serializers.CharField()
     email = serializers.EmailField()
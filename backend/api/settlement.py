@@ -0,0 +1,70 @@
+from decimal import Decimal
+from typing import Any, Dict
+
+from django.db import transaction
+from django.db.models import F, OuterRef, Q, Subquery, Sum
+from django.utils import timezone
+
+from .leaderboard import bets_settled
+from .models import Bet, RaceResult, User
+
+
+def winning_bets_filter(result: RaceResult) -> Q:
+    """Q object matching the bets of a race that are won according to `result`."""
+    condition = Q(pk__in=[])
+    if result.winner:
+        condition |= Q(bet_type='winner', selection=result.winner)
+    if result.podium:
+        condition |= Q(bet_type='podium', selection__in=result.podium)
+    if result.pole_sitter:
+        condition |= Q(bet_type='pole', selection=result.pole_sitter)
+    return condition
+
+
+def settle_race(result: RaceResult) -> Dict[str, Any]:
+    """Settle every pending bet of `result.race` with set-based queries.
+
+    The won and lost bets are flagged first, with one UPDATE each, and stamped
+    with the same `updated_at`. Winning users are then credited with a single
+    UPDATE (one aggregated amount per user), and the leaderboard entries and
+    buckets updated with a few more, all computed from exactly the stamped
+    rows: a bet committed meanwhile stays pending and is neither flagged nor
+    paid. Every statement runs in the same transaction, so a race is settled
+    entirely or not at all.
+    """
+    with transaction.atomic():
+        # Verrou sur le résultat : deux règlements concurrents ne créditent pas deux fois
+        RaceResult.objects.select_for_update().filter(pk=result.pk).exists()
+
+        now = timezone.now()
+        pending = Bet.objects.filter(race_id=result.race_id, status='pending')
+        won_count = pending.filter(winning_bets_filter(result)).update(status='won', updated_at=now)
+        # exclude() plutôt que « le reste » : un pari gagnant validé entre les deux UPDATE reste en attente
+        lost_count = pending.exclude(winning_bets_filter(result)).update(status='lost', updated_at=now)
+
+        # Les lignes de ce règlement, et elles seules
+        settled = Bet.objects.filter(race_id=result.race_id, status__in=('won', 'lost'), updated_at=now)
+        won = settled.filter(status='won')
+        lost = settled.filter(status='lost')
+
+        payout = won.aggregate(payout=Sum('potential_win'))['payout'] or Decimal('0.00')
+        if won_count:
+            credit = (
+                won.filter(user_id=OuterRef('pk'))
+                .values('user_id')
+                .annotate(total=Sum('potential_win'))
+                .values('total')
+            )
+            User.objects.filter(pk__in=won.values('user_id')).update(balance=F('balance') + Subquery(credit))
+
+        bets_settled(result.race, settled, won, lost)
+
+        result.settled_at = now
+        result.save(update_fields=['settled_at', 'updated_at'])
+
+    return {
+        'settled': won_count + lost_count,
+        'won': won_count,
+        'lost': lost_count,
+        'totalPayout': float(payout),
+    }
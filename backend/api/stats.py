@@ -0,0 +1,52 @@
+from decimal import Decimal
+from typing import Any, Dict, Iterable
+
+from django.db.models import Count, OuterRef, Q, Subquery, Sum
+
+from .models import Bet, User
+from .serializers import BetSerializer
+
+
+def user_stats(user_ids: Iterable[int]) -> Dict[int, Dict[str, Any]]:
+    """Betting statistics of several users, keyed by user id.
+
+    Every counter comes from one conditional-aggregation query over the users
+    and their bets; the best wins of all users are then loaded with a second
+    query. Unknown ids are absent from the result.
+    """
+    best_win = Bet.objects.filter(user=OuterRef('pk'), status='won').order_by('-potential_win').values('pk')[:1]
+    users = User.objects.filter(pk__in=list(user_ids)).values('pk').annotate(
+        total_bets=Count('bets'),
+        won_bets=Count('bets', filter=Q(bets__status='won')),
+        lost_bets=Count('bets', filter=Q(bets__status='lost')),
+        pending_bets=Count('bets', filter=Q(bets__status='pending')),
+        total_staked=Sum('bets__amount'),
+        won_amount=Sum('bets__potential_win', filter=Q(bets__status='won')),
+        lost_amount=Sum('bets__amount', filter=Q(bets__status='lost')),
+        best_win_id=Subquery(best_win),
+    )
+    rows = list(users)
+
+    best_win_ids = [row['best_win_id'] for row in rows if row['best_win_id']]
+    best_wins = Bet.objects.select_related('race').in_bulk(best_win_ids) if best_win_ids else {}
+
+    stats = {}
+    for row in rows:
+        total_staked = row['total_staked'] or Decimal('0.0')
+        profit = (row['won_amount'] or Decimal('0.0')) - (row['lost_amount'] or Decimal('0.0'))
+        roi = (profit / total_staked * 100) if total_staked > 0 else Decimal('0.0')
+        avg_stake = (total_staked / row['total_bets']) if row['total_bets'] > 0 else Decimal('0.0')
+        best = best_wins.get(row['best_win_id'])
+
+        stats[row['pk']] = {
+            'totalBets': row['total_bets'],
+            'wonBets': row['won_bets'],
+            'lostBets': row['lost_bets'],
+            'pendingBets': row['pending_bets'],
+            'profit': float(profit),
+            'roi': float(roi),
+            'totalStaked': float(total_staked),
+            'averageStake': float(avg_stake),
+            'bestWin': BetSerializer(best).data if best else None,
+        }
+    return stats
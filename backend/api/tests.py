@@ -1,3 +1,1034 @@
-from django.test import TestCase
+import json
+import os
+import tempfile
+import threading
+import time
+import uuid
+from datetime import date, timedelta, timezone as dt_timezone
+from decimal import Decimal
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+import msgpack
+from django.db import OperationalError, connection
+from django.db.backends.sqlite3.base import DatabaseWrapper
+from django.db.migrations.executor import MigrationExecutor
+from django.db.models import F
+from django.contrib.auth.hashers import make_password
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from .authentication import user_cache, version_key
+from .catalog import invalidate_catalog, refresh_database_stamp
+from .leaderboard import rebuild_leaderboard
+from .models import Bet, Driver, LeaderboardBucket, LeaderboardEntry, Race, RaceDriver, RaceResult, RevokedToken, User
+from .idempotency import response_cache
+from .odds import odds_index
+from .pagination import encode_cursor
+from .renderers import JSONRenderer as OrjsonRenderer
+from .revocation import BloomFilter, RevocationList, revocations
+from .rows import BET_ROW, RACE_DRIVER_ROW, USER_ROW
+from .serializers import BetSerializer, RaceDriverSerializer, UserSerializer
+from .views import build_tokens
+
+
+def run_concurrently(worker, count):
+    """Run `worker(index)` in `count` threads released at the same instant."""
+    barrier = threading.Barrier(count)
+    errors = []
+
+    def target(index):
+        try:
+            barrier.wait()
+            worker(index)
+        except Exception as exc:  # pragma: no cover - remonté par l'assertion
+            errors.append(exc)
+        finally:
+            connection.close()
+
+    threads = [threading.Thread(target=target, args=(index,)) for index in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return errors
+
+
+class BetFixtureMixin:
+    STAKE = Decimal('30.00')
+
+    def setUp(self):
+        cache.clear()
+        user_cache.clear()
+        # Filtre de révocation reconstruit hors des assertNumQueries
+        revocations.clear()
+        revocations.refresh()
+        self.user = User.objects.create_user(email='stress@example.com', password='x', name='Stress', balance=Decimal('100.00'))
+        self.race = Race.objects.create(name='GP', circuit='Circuit', city='Ville', country='Pays', date='2025-06-01')
+        self.driver = Driver.objects.create(name='Pilote', team='Équipe')
+        self.entry = RaceDriver.objects.create(race=self.race, driver=self.driver, winner_odds=Decimal('2.00'))
+        # Empreinte des tables du catalogue lue hors des assertNumQueries
+        refresh_database_stamp()
+
+    def client_for(self, user):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {build_tokens(user)['access']}")
+        return client
+
+    def payload(self, **overrides):
+        return {
+            'raceId': self.race.id,
+            'betType': 'winner',
+            'selection': 'Pilote',
+            'amount': str(self.STAKE),
+            'odds': '2.00',
+            **overrides,
+        }
+
+
+class PlaceBetConcurrencyTests(BetFixtureMixin, TransactionTestCase):
+    THREADS = 12
+
+    def place(self, index):
+        client = self.client_for(self.user)
+        payload = self.payload()
+        # SQLite en mémoire signale les conflits d'écriture au lieu d'attendre : on rejoue
+        for _ in range(200):
+            try:
+                response = client.post('/api/bets/place', payload, format='json')
+            except OperationalError:
+                time.sleep(0.005)
+                continue
+            self.assertIn(response.status_code, (201, 400))
+            return
+        self.fail('la base est restée verrouillée')
+
+    def test_concurrent_bets_never_overdraw_nor_lose_updates(self):
+        errors = run_concurrently(self.place, self.THREADS)
+        self.assertEqual(errors, [])
+
+        self.user.refresh_from_db()
+        bets = Bet.objects.filter(user=self.user)
+        placed = bets.count()
+        # 100 € de solde, mises de 30 € : exactement trois paris passent
+        self.assertEqual(placed, 3)
+        self.assertEqual(self.user.balance, Decimal('100.00') - placed * self.STAKE)
+        self.assertGreaterEqual(self.user.balance, 0)
+
+
+class AuthenticationTests(BetFixtureMixin, TestCase):
+    def test_cached_user_skips_the_auth_query(self):
+        client = self.client_for(self.user)
+        client.get('/api/bets/my-bets')
+        client.post('/api/bets/place', self.payload(), format='json')
+
+        with self.assertNumQueries(1):  # solde et totaux, relus par MeView
+            body = client.get('/api/auth/me').json()
+        self.assertEqual(body['user']['balance'], 70.0)
+        self.assertEqual(body['user']['totalBets'], 1)
+
+    def test_role_and_ban_changes_refuse_older_tokens(self):
+        admin = User.objects.create_user(email='admin@example.com', password='x', name='Admin', role='admin')
+        client, stale = self.client_for(admin), self.client_for(self.user)
+        self.assertEqual(stale.get('/api/bets/my-bets').status_code, 200)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(client.patch(f'/api/admin/users/{self.user.id}/role', {'role': 'admin'}, format='json').status_code, 200)
+        self.assertEqual(stale.get('/api/bets/my-bets').status_code, 401)
+        self.user.refresh_from_db()
+        fresh = self.client_for(self.user)
+        self.assertEqual(fresh.get('/api/admin/users').status_code, 200)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            client.patch(f'/api/admin/users/{self.user.id}/ban', {'banned': True}, format='json')
+        self.assertEqual(fresh.get('/api/admin/users').status_code, 401)
+
+    def test_change_made_by_another_worker_is_seen_when_the_version_expires(self):
+        client = self.client_for(self.user)
+        self.assertEqual(client.get('/api/bets/my-bets').status_code, 200)
+        # Autre worker sans cache partagé : rien n'est publié dans le cache de celui-ci
+        User.objects.filter(pk=self.user.pk).update(auth_version=F('auth_version') + 1)
+        self.assertEqual(client.get('/api/bets/my-bets').status_code, 200)
+
+        cache.delete(version_key(self.user.pk))  # AUTH_USER_CACHE_TTL écoulé
+        self.assertEqual(client.get('/api/bets/my-bets').status_code, 401)
+
+    def test_tokens_without_version_claim_use_the_database(self):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(self.user).access_token}')
+        with self.assertNumQueries(2):  # utilisateur, page
+            self.assertEqual(client.get('/api/bets/my-bets').status_code, 200)
+
+
+class TokenRevocationTests(BetFixtureMixin, TestCase):
+    def test_logout_revokes_the_access_and_refresh_tokens(self):
+        tokens = build_tokens(self.user)
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {tokens['access']}")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(client.post('/api/auth/logout', {'refresh': tokens['refresh']}, format='json').status_code, 204)
+
+        self.assertEqual(RevokedToken.objects.filter(user=self.user).count(), 2)
+        self.assertEqual(client.get('/api/bets/my-bets').status_code, 401)
+        self.assertEqual(self.client_for(self.user).get('/api/bets/my-bets').status_code, 200)
+        # Autre worker : filtre reconstruit depuis la table
+        revocations.clear()
+        self.assertEqual(client.get('/api/bets/my-bets').status_code, 401)
+
+    def test_unrevoked_tokens_are_answered_from_memory(self):
+        with self.assertNumQueries(0):
+            self.assertFalse(revocations.is_revoked('inconnu'))
+        # Faux positif du filtre : confirmé (et infirmé) par la table
+        revocations.add('faux-positif')
+        with self.assertNumQueries(1):
+            self.assertFalse(revocations.is_revoked('faux-positif'))
+
+    def test_revocations_of_other_workers_are_picked_up_incrementally(self):
+        worker = RevocationList(capacity=100, error_rate=0.01, refresh=0, rebuild=3600)
+        self.assertFalse(worker.is_revoked('autre'))
+        RevokedToken.objects.create(jti='autre', user=self.user, expires_at=timezone.now() + timedelta(minutes=5))
+
+        # Cache non partagé : seule la table dit qu'un autre worker a révoqué le jeton
+        with self.assertNumQueries(1):  # lignes créées depuis le dernier rafraîchissement
+            worker.refresh()
+        self.assertTrue(worker.is_revoked('autre'))
+
+    def test_bloom_filter_has_no_false_negatives(self):
+        bloom = BloomFilter(capacity=1000, error_rate=0.01)
+        for index in range(1000):
+            bloom.add(f'jti-{index}')
+        self.assertTrue(all(f'jti-{index}' in bloom for index in range(1000)))
+        false_positives = sum(f'autre-{index}' in bloom for index in range(10_000))
+        self.assertLess(false_positives, 300)
+
+
+class PasswordHashingTests(TestCase):
+    def test_login_rehashes_to_the_current_profile(self):
+        user = User.objects.create_user(email='ancien@example.com', password_hash=make_password('secret', hasher='scrypt'), name='Ancien')
+        client = APIClient()
+
+        self.assertEqual(client.post('/api/auth/login', {'email': user.email, 'password': 'faux'}, format='json').status_code, 401)
+        self.assertEqual(client.post('/api/auth/login', {'email': 'inconnu@example.com', 'password': 'secret'}, format='json').status_code, 401)
+        response = client.post('/api/auth/login', {'email': user.email, 'password': 'secret'}, format='json')
+
+        self.assertEqual(response.status_code, 200)
+        user.refresh_from_db()
+        self.assertTrue(user.password.startswith('pbkdf2_sha256$'))
+        self.assertTrue(user.check_password('secret'))
+
+    def test_signup_hashes_off_the_request_thread(self):
+        response = APIClient().post('/api/auth/signup', {'email': 'nouveau@example.com', 'password': 'secret', 'name': 'Nouveau'}, format='json')
+
+        self.assertEqual(response.status_code, 201)
+        self.assertTrue(User.objects.get(email='nouveau@example.com').check_password('secret'))
+
+    @override_settings(PASSWORD_HASHING_WAIT=0)
+    def test_busy_pool_answers_503(self):
+        slots = threading.BoundedSemaphore(1)
+        slots.acquire()
+        with mock.patch('api.hashers._pool_and_slots', return_value=(None, slots)):
+            response = APIClient().post('/api/auth/login', {'email': 'a@example.com', 'password': 'secret'}, format='json')
+
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response['Retry-After'], '1')
+
+
+class PlaceBetTests(BetFixtureMixin, TestCase):
+    def test_rejected_debit_rolls_back_the_bet(self):
+        response = self.client_for(self.user).post('/api/bets/place', self.payload(amount='150'), format='json')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Bet.objects.exists())
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.balance, Decimal('100.00'))
+
+    def test_stale_odds_are_rejected_without_querying_race_drivers(self):
+        client = self.client_for(self.user)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.entry.winner_odds = Decimal('2.50')
+            self.entry.save()
+
+        self.assertEqual(client.post('/api/bets/place', self.payload(odds='2.50'), format='json').status_code, 201)
+        with self.assertNumQueries(1):  # course (utilisateur en cache)
+            response = client.post('/api/bets/place', self.payload(), format='json')
+
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.json()['odds'], 2.5)
+        self.assertEqual(Bet.objects.count(), 1)
+
+    def test_unknown_selection_is_rejected(self):
+        response = self.client_for(self.user).post('/api/bets/place', self.payload(selection='Inconnu'), format='json')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Bet.objects.exists())
+
+    def test_odds_changed_by_another_worker_are_seen_after_the_refresh_delay(self):
+        client = self.client_for(self.user)
+        odds_index.get(self.race.id, 'Pilote', 'winner')
+        # Écriture d'un autre worker : aucune version publiée dans le cache de celui-ci
+        RaceDriver.objects.filter(pk=self.entry.pk).update(winner_odds=Decimal('3.00'), updated_at=timezone.now())
+
+        self.assertEqual(client.post('/api/bets/place', self.payload(odds='3.00'), format='json').status_code, 409)
+        with override_settings(CATALOG_VERSION_REFRESH=timedelta(0)):
+            response = client.post('/api/bets/place', self.payload(odds='3.00'), format='json')
+        self.assertEqual(response.status_code, 201)
+
+    def test_malformed_selections_are_rejected_on_both_endpoints(self):
+        client = self.client_for(self.user)
+        cases = [
+            ({'amount': 'NaN'}, 400),
+            ({'odds': 'NaN'}, 400),
+            ({'amount': 'Infinity'}, 400),
+            ({'betType': ['winner']}, 400),
+            ({'selection': ['Pilote']}, 400),
+            ({'selection': {'a': 1}}, 400),
+            ({'raceId': 10 ** 30}, 404),
+        ]
+        for overrides, status_code in cases:
+            with self.subTest(**{key: repr(value) for key, value in overrides.items()}):
+                response = client.post('/api/bets/place', self.payload(**overrides), format='json')
+                self.assertEqual(response.status_code, status_code)
+                response = client.post('/api/bets/place-batch', {'bets': [self.payload(**overrides)]}, format='json')
+                self.assertEqual(response.status_code, status_code)
+                self.assertEqual(response.json()['index'], 0)
+        self.assertFalse(Bet.objects.exists())
+
+    def test_bets_are_closed_once_the_result_is_known(self):
+        RaceResult.objects.create(race=self.race, finishing_order=['Pilote'], pole_sitter='Pilote')
+        client = self.client_for(self.user)
+
+        response = client.post('/api/bets/place', self.payload(), format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()['error'], 'Les paris sont clos pour cette course')
+        response = client.post('/api/bets/place-batch', {'bets': [self.payload()]}, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Bet.objects.exists())
+
+
+class PlaceBetSlipTests(BetFixtureMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.other_race = Race.objects.create(name='GP 2', circuit='Circuit', city='Ville', country='Pays', date='2025-06-15')
+        RaceDriver.objects.create(race=self.other_race, driver=self.driver, podium_odds=Decimal('1.50'))
+
+    def test_slip_is_placed_with_a_constant_number_of_queries(self):
+        slip = [
+            self.payload(amount='10'),
+            self.payload(amount='20'),
+            self.payload(raceId=self.other_race.id, betType='podium', odds='1.50', amount='5'),
+        ]
+        odds_index.get(self.race.id, 'Pilote', 'winner')  # index chargé une fois par worker
+        with self.assertNumQueries(7):  # JWT, courses, savepoint, insert, classement, débit, release
+            response = self.client_for(self.user).post('/api/bets/place-batch', {'bets': slip}, format='json')
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(len(response.json()['bets']), 3)
+        self.assertEqual(response.json()['bets'][2]['potentialWin'], 7.5)
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.balance, Decimal('65.00'))
+
+    def test_slip_is_all_or_nothing(self):
+        slip = [self.payload(amount='60'), self.payload(amount='60')]
+        response = self.client_for(self.user).post('/api/bets/place-batch', {'bets': slip}, format='json')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Bet.objects.exists())
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.balance, Decimal('100.00'))
+
+    def test_invalid_selection_reports_its_index(self):
+        slip = [self.payload(amount='10'), self.payload(odds='9.99')]
+        response = self.client_for(self.user).post('/api/bets/place-batch', {'bets': slip}, format='json')
+
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.json()['index'], 1)
+        self.assertFalse(Bet.objects.exists())
+
+
+class IdempotencyTests(BetFixtureMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        response_cache.clear()
+
+    def test_retry_replays_the_first_response_without_placing_again(self):
+        client = self.client_for(self.user)
+        first = client.post('/api/bets/place', self.payload(), format='json', HTTP_IDEMPOTENCY_KEY='abc')
+        with self.assertNumQueries(0):  # utilisateur et réponse servis par les caches mémoire
+            retry = client.post('/api/bets/place', self.payload(), format='json', HTTP_IDEMPOTENCY_KEY='abc')
+
+        self.assertEqual(first.status_code, 201)
+        self.assertEqual(retry.status_code, 201)
+        self.assertEqual(retry.json(), first.json())
+        self.assertEqual(retry['Idempotent-Replayed'], 'true')
+        self.assertEqual(Bet.objects.count(), 1)
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.balance, Decimal('70.00'))
+
+    def test_retry_on_another_worker_reads_the_stored_response(self):
+        client = self.client_for(self.user)
+        first = client.post('/api/bets/place', self.payload(), format='json', HTTP_IDEMPOTENCY_KEY='abc')
+        response_cache.clear()
+        retry = client.post('/api/bets/place', self.payload(), format='json', HTTP_IDEMPOTENCY_KEY='abc')
+
+        self.assertEqual(retry.json(), first.json())
+        self.assertEqual(Bet.objects.count(), 1)
+
+    def test_key_reused_for_another_payload_is_rejected(self):
+        client = self.client_for(self.user)
+        client.post('/api/bets/place', self.payload(), format='json', HTTP_IDEMPOTENCY_KEY='abc')
+        response = client.post('/api/bets/place', self.payload(amount='10'), format='json', HTTP_IDEMPOTENCY_KEY='abc')
+
+        self.assertEqual(response.status_code, 422)
+        self.assertEqual(Bet.objects.count(), 1)
+
+    def test_failed_request_is_not_stored(self):
+        client = self.client_for(self.user)
+        failed = client.post('/api/bets/place', self.payload(amount='500'), format='json', HTTP_IDEMPOTENCY_KEY='abc')
+        retry = client.post('/api/bets/place', self.payload(), format='json', HTTP_IDEMPOTENCY_KEY='abc')
+
+        self.assertEqual(failed.status_code, 400)
+        self.assertEqual(retry.status_code, 201)
+        self.assertEqual(Bet.objects.count(), 1)
+
+
+class LeaderboardTests(BetFixtureMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.admin = User.objects.create_user(email='admin@example.com', password='x', name='Admin', role='admin')
+        self.rival = User.objects.create_user(email='rival@example.com', password='x', name='Rival')
+        RaceDriver.objects.create(race=self.race, driver=Driver.objects.create(name='Autre', team='Équipe'), winner_odds=Decimal('3.00'))
+
+    def snapshot(self):
+        fields = ('user_id', 'total_bets', 'total_wins', 'total_losses', 'profit')
+        return (
+            list(LeaderboardEntry.objects.order_by('user_id').values_list(*fields)),
+            list(LeaderboardBucket.objects.order_by('bucket', 'user_id').values_list('bucket', *fields)),
+        )
+
+    def test_incremental_updates_match_a_full_rebuild(self):
+        self.client_for(self.user).post('/api/bets/place-batch', {'bets': [
+            self.payload(amount='10'),
+            self.payload(betType='winner', selection='Autre', odds='3.00', amount='20'),
+        ]}, format='json')
+        self.client_for(self.rival).post('/api/bets/place', self.payload(selection='Autre', odds='3.00', amount='50'), format='json')
+        pending = self.client_for(self.rival).post('/api/bets/place', self.payload(amount='5'), format='json').json()['bet']
+        admin = self.client_for(self.admin)
+        admin.patch(f"/api/admin/bets/{pending['id']}/settle", {'result': 'lost'}, format='json')
+        admin.post(f'/api/admin/races/{self.race.id}/result', {'finishingOrder': ['Autre', 'Pilote'], 'poleSitter': 'Pilote'}, format='json')
+
+        incremental = self.snapshot()
+        rebuild_leaderboard()
+        self.assertEqual(incremental, self.snapshot())
+
+        rows = self.client.get('/api/leaderboard?limit=2').json()
+        self.assertEqual([row['id'] for row in rows['leaderboard']], [self.rival.id, self.user.id])
+        self.assertEqual(rows['leaderboard'][0]['profit'], 145.0)
+        self.assertEqual(rows['next'], 2)
+
+        me = self.client_for(self.user).get('/api/leaderboard/me').json()['entry']
+        self.assertEqual((me['rank'], me['profit'], me['totalWins'], me['totalLosses']), (2, 50.0, 1, 1))
+
+        for query in (f'race={self.race.id}', 'period=2025-06'):
+            rows = self.client.get(f'/api/leaderboard?{query}').json()['leaderboard']
+            self.assertEqual([(row['id'], row['totalBets'], row['profit']) for row in rows], [
+                (self.rival.id, 2, 145.0),
+                (self.user.id, 2, 50.0),
+            ])
+        self.assertEqual(self.client.get('/api/leaderboard?period=2025-07').json()['leaderboard'], [])
+        self.assertEqual(self.client.get('/api/leaderboard?period=juin').status_code, 400)
+
+    def test_malformed_race_filters_are_rejected(self):
+        for race in ('²', '1.5', str(2 ** 63)):
+            response = self.client.get('/api/leaderboard', {'race': race})
+            self.assertEqual(response.status_code, 400, race)
+            self.assertEqual(response.json(), {'error': 'Course invalide'})
+
+    def test_settling_again_only_pays_pending_bets(self):
+        self.client_for(self.user).post('/api/bets/place', self.payload(), format='json')
+        admin = self.client_for(self.admin)
+        result = {'finishingOrder': ['Pilote', 'Autre'], 'poleSitter': 'Pilote'}
+
+        first = admin.post(f'/api/admin/races/{self.race.id}/result', result, format='json').json()
+        again = admin.post(f'/api/admin/races/{self.race.id}/result', result, format='json').json()
+
+        self.assertEqual((first['won'], first['totalPayout']), (1, 60.0))
+        self.assertEqual((again['settled'], again['totalPayout']), (0, 0.0))
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.balance, Decimal('130.00'))
+        incremental = self.snapshot()
+        rebuild_leaderboard()
+        self.assertEqual(incremental, self.snapshot())
+
+
+class UserStatsTests(BetFixtureMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        Bet.objects.create(user=self.user, race=self.race, bet_type='winner', selection='Pilote', amount=Decimal('10'), odds=Decimal('2.00'), status='won')
+        Bet.objects.create(user=self.user, race=self.race, bet_type='winner', selection='Pilote', amount=Decimal('20'), odds=Decimal('3.00'), status='won')
+        Bet.objects.create(user=self.user, race=self.race, bet_type='pole', selection='Pilote', amount=Decimal('5'), odds=Decimal('2.00'), status='lost')
+        Bet.objects.create(user=self.user, race=self.race, bet_type='podium', selection='Pilote', amount=Decimal('5'), odds=Decimal('1.50'))
+        self.other = User.objects.create_user(email='other@example.com', password='x', name='Other')
+
+    def test_stats_are_computed_in_two_queries(self):
+        with self.assertNumQueries(2):
+            stats = self.client.get(f'/api/stats/user/{self.user.id}').json()['stats']
+
+        self.assertEqual(
+            {key: value for key, value in stats.items() if key != 'bestWin'},
+            {
+                'totalBets': 4, 'wonBets': 2, 'lostBets': 1, 'pendingBets': 1,
+                'profit': 75.0, 'roi': 187.5, 'totalStaked': 40.0, 'averageStake': 10.0,
+            },
+        )
+        self.assertEqual(stats['bestWin']['potentialWin'], 60.0)
+
+    def test_batch_stats(self):
+        with self.assertNumQueries(2):
+            stats = self.client.get(f'/api/stats/users?ids={self.user.id},{self.other.id},999').json()['stats']
+
+        self.assertEqual(set(stats), {str(self.user.id), str(self.other.id)})
+        self.assertEqual(stats[str(self.other.id)]['totalBets'], 0)
+        self.assertIsNone(stats[str(self.other.id)]['bestWin'])
+        self.assertEqual(self.client.get('/api/stats/user/999').status_code, 404)
+
+    def test_batch_stats_reject_invalid_ids(self):
+        for ids in ('abc', f'{self.user.id},{"9" * 20}'):
+            response = self.client.get('/api/stats/users', {'ids': ids})
+            self.assertEqual(response.status_code, 400, ids)
+            self.assertEqual(response.json(), {'error': 'Identifiants invalides'})
+
+
+class AdminUsersTests(BetFixtureMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.admin = User.objects.create_user(email='admin@example.com', password='x', name='Admin', role='admin')
+        for index in range(5):
+            User.objects.create_user(email=f'joueur{index}@example.com', password='x', name=f'Joueur {index}')
+        self.client_for(self.user).post('/api/bets/place', self.payload(amount='10'), format='json')
+
+    def test_listing_cost_does_not_grow_with_users(self):
+        with self.assertNumQueries(3):  # JWT, page, total
+            body = self.client_for(self.admin).get('/api/admin/users?limit=3').json()
+
+        self.assertEqual(len(body['users']), 3)
+        self.assertEqual((body['count'], body['next']), (7, 3))
+        self.assertEqual(body['users'][0]['totalBets'], 1)
+
+    def test_search(self):
+        body = self.client_for(self.admin).get('/api/admin/users?search=joueur 3').json()
+        self.assertEqual([user['email'] for user in body['users']], ['joueur3@example.com'])
+
+
+class BetPaginationTests(BetFixtureMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.user.balance = Decimal('1000.00')
+        self.user.save()
+        client = self.client_for(self.user)
+        for _ in range(5):
+            client.post('/api/bets/place', self.payload(amount='10'), format='json')
+
+    def test_cursor_walks_every_bet_once_newest_first(self):
+        client = self.client_for(self.user)
+        seen, url = [], '/api/bets/my-bets?limit=2'
+        while url:
+            with self.assertNumQueries(1):  # page (utilisateur en cache)
+                body = client.get(url).json()
+            seen += [bet['id'] for bet in body['bets']]
+            url = body['next'] and f"/api/bets/my-bets?limit=2&cursor={body['next']}"
+
+        expected = [str(pk) for pk in Bet.objects.order_by('-created_at', '-id').values_list('pk', flat=True)]
+        self.assertEqual(seen, expected)
+
+    def test_admin_listing_and_invalid_cursor(self):
+        admin = User.objects.create_user(email='admin@example.com', password='x', name='Admin', role='admin')
+        client = self.client_for(admin)
+        first = client.get('/api/admin/bets?limit=3').json()
+        second = client.get(f"/api/admin/bets?limit=3&cursor={first['next']}").json()
+
+        self.assertEqual((len(first['bets']), len(second['bets']), second['next']), (3, 2, None))
+        self.assertEqual(client.get('/api/admin/bets?cursor=pas-un-curseur').status_code, 400)
+
+    def test_cursor_with_an_invalid_id_is_rejected(self):
+        cursor = encode_cursor(timezone.now(), 'zzz')
+        self.assertEqual(self.client_for(self.user).get(f'/api/bets/my-bets?cursor={cursor}').status_code, 400)
+
+
+class ImportAssociationsTests(BetFixtureMixin, TestCase):
+    def test_every_pair_is_created_in_constant_queries(self):
+        admin = User.objects.create_user(email='admin@example.com', password='x', name='Admin', role='admin')
+        verstappen = Driver.objects.create(name='Max Verstappen', team='Red Bull')
+        for index in range(30):
+            Race.objects.create(name=f'GP {index}', circuit='Circuit', city='Ville', country='Pays', date='2025-08-01')
+
+        with self.assertNumQueries(7):  # JWT, pilotes, courses, savepoint, DELETE, INSERT, release
+            response = self.client_for(admin).post('/api/admin/import/associations')
+
+        self.assertEqual(response.json(), {'count': 31 * 2})
+        self.assertEqual(RaceDriver.objects.count(), 62)
+        entry = RaceDriver.objects.get(race=self.race, driver=verstappen)
+        self.assertEqual((entry.winner_odds, entry.podium_odds, entry.pole_odds), (Decimal('2.10'), Decimal('1.50'), Decimal('1.80')))
+        self.assertEqual(RaceDriver.objects.get(race=self.race, driver=self.driver).winner_odds, Decimal('25.00'))
+
+
+class CatalogDuplicatesMigrationTests(TransactionTestCase):
+    """0009 merges the duplicate drivers and races before adding the unique constraints."""
+
+    before = [('api', '0008_bet_status_indexes')]
+    after = [('api', '0009_catalog_natural_keys')]
+
+    def tearDown(self):
+        MigrationExecutor(connection).migrate(MigrationExecutor(connection).loader.graph.leaf_nodes())
+
+    def test_duplicates_are_merged(self):
+        executor = MigrationExecutor(connection)
+        executor.migrate(self.before)
+        apps = executor.loader.project_state(self.before).apps
+        Driver, Race, RaceDriver = (apps.get_model('api', name) for name in ('Driver', 'Race', 'RaceDriver'))
+        Bet, LeaderboardBucket, User = (apps.get_model('api', name) for name in ('Bet', 'LeaderboardBucket', 'User'))
+
+        user = User.objects.create(email='doublon@example.com', name='Doublon')
+        races = [Race.objects.create(name='GP', circuit='Circuit', city='Ville', country='Pays', date='2025-06-01') for _ in range(2)]
+        drivers = [Driver.objects.create(name='Pilote', team='Équipe') for _ in range(2)]
+        RaceDriver.objects.create(race=races[0], driver=drivers[0], winner_odds=Decimal('2.00'))
+        RaceDriver.objects.create(race=races[1], driver=drivers[1], winner_odds=Decimal('3.00'))
+        Bet.objects.create(
+            user=user, race=races[1], bet_type='winner', selection='Pilote',
+            amount=Decimal('10.00'), odds=Decimal('3.00'), potential_win=Decimal('30.00'), status='lost',
+        )
+        for race in races:
+            LeaderboardBucket.objects.create(
+                bucket=f'race:{race.pk}', user=user, total_bets=1, total_losses=1, profit=Decimal('-10.00')
+            )
+
+        executor = MigrationExecutor(connection)
+        executor.migrate(self.after)
+        apps = executor.loader.project_state(self.after).apps
+        Race, Driver, RaceDriver = (apps.get_model('api', name) for name in ('Race', 'Driver', 'RaceDriver'))
+        Bet, LeaderboardBucket = apps.get_model('api', 'Bet'), apps.get_model('api', 'LeaderboardBucket')
+
+        self.assertEqual(list(Race.objects.values_list('pk', flat=True)), [races[0].pk])
+        self.assertEqual(list(Driver.objects.values_list('pk', flat=True)), [drivers[0].pk])
+        self.assertEqual(list(RaceDriver.objects.values_list('race_id', 'driver_id', 'winner_odds')), [
+            (races[0].pk, drivers[0].pk, Decimal('2.00')),
+        ])
+        self.assertEqual(Bet.objects.get().race_id, races[0].pk)
+        self.assertEqual(list(LeaderboardBucket.objects.values_list('bucket', 'total_bets', 'profit')), [
+            (f'race:{races[0].pk}', 2, Decimal('-20.00')),
+        ])
+
+
+class CatalogImportTests(BetFixtureMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.admin = User.objects.create_user(email='admin@example.com', password='x', name='Admin', role='admin')
+
+    def test_reimport_updates_in_place_and_keeps_bets(self):
+        client = self.client_for(self.admin)
+        self.assertEqual(client.post('/api/admin/import/races').json(), {'count': 24, 'created': 24, 'updated': 0, 'unchanged': 0})
+        bahrain = Race.objects.get(name='Grand Prix de Bahreïn')
+        entry = RaceDriver.objects.create(race=bahrain, driver=self.driver, winner_odds=Decimal('3.00'))
+        bet = Bet.objects.create(user=self.user, race=bahrain, bet_type='winner', selection='Pilote', amount=Decimal('10'), odds=Decimal('3.00'))
+        Race.objects.filter(pk=bahrain.pk).update(laps=10)
+
+        with self.assertNumQueries(4):  # lecture, savepoint, UPSERT, release
+            body = client.post('/api/admin/import/races').json()
+
+        self.assertEqual(body, {'count': 24, 'created': 0, 'updated': 1, 'unchanged': 23})
+        bahrain.refresh_from_db()
+        self.assertEqual(bahrain.laps, 57)
+        self.assertTrue(Bet.objects.filter(pk=bet.pk).exists())
+        self.assertTrue(RaceDriver.objects.filter(pk=entry.pk).exists())
+
+    def test_unchanged_import_writes_nothing(self):
+        client = self.client_for(self.admin)
+        self.assertEqual(client.post('/api/admin/import/drivers').json()['created'], 20)
+        stamps = list(Driver.objects.order_by('pk').values_list('updated_at', flat=True))
+
+        with self.assertNumQueries(1):  # lecture
+            body = client.post('/api/admin/import/drivers').json()
+
+        self.assertEqual(body, {'count': 20, 'created': 0, 'updated': 0, 'unchanged': 20})
+        self.assertEqual(list(Driver.objects.order_by('pk').values_list('updated_at', flat=True)), stamps)
+
+
+class ResetBettingDataTests(BetFixtureMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.admin = User.objects.create_user(email='admin@example.com', password='x', name='Admin', role='admin')
+        for _ in range(5):
+            Bet.objects.create(user=self.user, race=self.race, bet_type='winner', selection='Pilote', amount=Decimal('10'), odds=Decimal('2.00'))
+        RaceResult.objects.create(race=self.race, finishing_order=['Pilote'], pole_sitter='Pilote')
+
+    def test_clean_view_deletes_in_dependency_order(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            body = self.client_for(self.admin).post('/api/admin/import/clean').json()
+
+        self.assertEqual(body['details'], {'bets': 5, 'raceResults': 1, 'raceDrivers': 1, 'races': 1, 'drivers': 1})
+        self.assertEqual(body['deleted'], 9)
+        self.assertFalse(Race.objects.exists() or Driver.objects.exists() or Bet.objects.exists())
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.balance, Decimal('1000'))
+        self.assertEqual(LeaderboardEntry.objects.get(user=self.user).total_bets, 0)
+
+    def test_command_deletes_by_chunks(self):
+        out = StringIO()
+        call_command('reset_betting_data', '--chunk-size', '2', stdout=out)
+
+        self.assertIn('bets : 2 supprimé(s)', out.getvalue())
+        self.assertIn('bets : 5 supprimé(s)', out.getvalue())
+        self.assertFalse(Bet.objects.exists())
+        self.assertFalse(RaceResult.objects.exists())
+
+
+class GenerateDatasetTests(TestCase):
+    def test_dataset_is_consistent_and_reproducible(self):
+        call_command('generate_dataset', '--users', '40', '--bets', '1500', '--seasons', '2', '--seed', '7', stdout=StringIO())
+
+        players = User.objects.filter(email__startswith='loadtest-')
+        self.assertEqual(players.count(), 40)
+        self.assertGreater(Bet.objects.count(), 1400)
+        self.assertTrue(Bet.objects.filter(status='pending').exists())
+        for player in User.objects.with_bet_totals().filter(email__startswith='loadtest-'):
+            bets = Bet.objects.filter(user=player)
+            staked = sum(bet.amount for bet in bets)
+            won = sum(bet.potential_win for bet in bets if bet.status == 'won')
+            self.assertEqual(player.balance, Decimal('1000.00') - staked + won)
+            self.assertEqual(player.total_bets, bets.count())
+
+        # Classement écrit pendant la génération = classement recalculé depuis les paris
+        def standings():
+            return (
+                sorted(LeaderboardEntry.objects.values_list('user_id', 'total_bets', 'total_wins', 'total_losses', 'profit')),
+                sorted(LeaderboardBucket.objects.values_list('bucket', 'user_id', 'total_bets', 'total_wins', 'total_losses', 'profit')),
+            )
+
+        generated = standings()
+        rebuild_leaderboard()
+        self.assertEqual(generated, standings())
+
+        for result in RaceResult.objects.select_related('race'):
+            winners = Bet.objects.filter(race=result.race, bet_type='winner', status='won')
+            self.assertFalse(winners.exclude(selection=result.winner).exists())
+
+        def fingerprint(prefix):
+            bets = Bet.objects.filter(user__email__startswith=f'{prefix}-')
+            return sorted(bets.values_list('user__email', 'bet_type', 'selection', 'amount', 'status'))
+
+        call_command('generate_dataset', '--users', '40', '--bets', '1500', '--seasons', '2', '--seed', '7', '--prefix', 'bis', stdout=StringIO())
+        self.assertEqual(
+            [row[1:] for row in fingerprint('loadtest')],
+            [row[1:] for row in fingerprint('bis')],
+        )
+
+    def test_calendar_follows_the_current_date(self):
+        # Après la dernière course du calendrier de référence : la saison générée est la suivante
+        with mock.patch('django.utils.timezone.localdate', return_value=date(2026, 12, 10)):
+            call_command('generate_dataset', '--users', '5', '--bets', '200', '--seasons', '2', stdout=StringIO())
+
+        self.assertTrue(Bet.objects.filter(status='pending').exists())
+        self.assertTrue(Bet.objects.filter(status__in=['won', 'lost']).exists())
+        self.assertTrue(Race.objects.filter(date__gte=date(2026, 12, 10)).exists())
+
+
+class RowFormatTests(BetFixtureMixin, TestCase):
+    def assertSameJson(self, fast, slow):
+        self.assertEqual(JSONRenderer().render(fast), JSONRenderer().render(slow))
+
+    def test_output_is_byte_identical_to_the_serializers(self):
+        client = self.client_for(self.user)
+        client.post('/api/bets/place', self.payload(), format='json')
+        client.post('/api/bets/place', self.payload(amount='12.35'), format='json')
+        User.objects.create_user(email='nouveau@example.com', password='x', name='Nouveau')
+
+        bets = Bet.objects.select_related('race').order_by('created_at')
+        self.assertSameJson(BET_ROW.many(BET_ROW.rows(bets)), BetSerializer(bets, many=True).data)
+
+        entries = RaceDriver.objects.select_related('driver').order_by('pk')
+        self.assertSameJson(RACE_DRIVER_ROW.many(RACE_DRIVER_ROW.rows(entries)), RaceDriverSerializer(entries, many=True).data)
+
+        users = User.objects.with_bet_totals().order_by('pk')
+        self.assertSameJson(USER_ROW.many(USER_ROW.rows(users)), UserSerializer(users, many=True).data)
+
+
+class RendererTests(BetFixtureMixin, TestCase):
+    def test_orjson_output_matches_the_stdlib_renderer(self):
+        paris = timezone.localtime()
+        data = {
+            'bets': BET_ROW.many(BET_ROW.rows(Bet.objects.all())),
+            'amount': Decimal('12.50'),
+            'id': uuid.uuid4(),
+            'placedAt': paris,
+            'utc': paris.astimezone(dt_timezone.utc),
+            'day': paris.date(),
+            'name': 'Équipe 🏎 \u2028',
+            'nested': [{'odds': 2.5, 'none': None, 'flag': True}],
+            7: 'clé entière',
+        }
+        self.assertEqual(OrjsonRenderer().render(data), JSONRenderer().render(data))
+
+    def test_invalid_json_body_is_a_400(self):
+        response = self.client_for(self.user).post('/api/bets/place', '{"raceId": ', content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+
+    def test_messagepack_negotiation(self):
+        response = self.client.get(f'/api/races/{self.race.id}/card', HTTP_ACCEPT='application/msgpack')
+        self.assertEqual(response['Content-Type'], 'application/msgpack')
+        self.assertEqual(msgpack.unpackb(response.content), self.client.get(f'/api/races/{self.race.id}/card').json())
+
+
+class BetExportTests(BetFixtureMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.admin = User.objects.create_user(email='admin@example.com', password='x', name='Admin', role='admin')
+        other = Race.objects.create(name='Autre GP', circuit='Circuit', city='Ville', country='Pays', date='2025-07-01')
+        Bet.objects.create(user=self.user, race=self.race, bet_type='winner', selection='Pilote', amount=Decimal('10.00'), odds=Decimal('2.00'))
+        Bet.objects.create(user=self.user, race=other, bet_type='pole', selection='Pilote', amount=Decimal('5.00'), odds=Decimal('3.00'), status='lost')
+
+    def test_streams_filtered_csv(self):
+        response = self.client_for(self.admin).get(f'/api/admin/bets/export?race={self.race.id}&status=pending')
+
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Type'], 'text/csv; charset=utf-8')
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual(lines[0].split(',')[:3], ['id', 'userId', 'userEmail'])
+        self.assertEqual(len(lines), 2)
+        self.assertIn('GP,winner,Pilote,10.00,2.00,20.00,pending', lines[1])
+
+    def test_ndjson_and_date_range(self):
+        today = timezone.localdate().isoformat()
+        response = self.client_for(self.admin).get(f'/api/admin/bets/export?output=ndjson&from={today}&to={today}')
+        rows = [json.loads(line) for line in b''.join(response.streaming_content).splitlines()]
+        self.assertEqual([row['betType'] for row in rows], ['winner', 'pole'])
+        self.assertEqual(rows[1]['raceName'], 'Autre GP')
+
+        response = self.client_for(self.admin).get('/api/admin/bets/export?to=2020-01-01')
+        self.assertEqual(len(b''.join(response.streaming_content).splitlines()), 1)
+
+    def test_invalid_filters_are_rejected(self):
+        client = self.client_for(self.admin)
+        self.assertEqual(client.get('/api/admin/bets/export?status=perdu').status_code, 400)
+        self.assertEqual(client.get('/api/admin/bets/export?from=hier').status_code, 400)
+        self.assertEqual(client.get('/api/admin/bets/export?output=xml').status_code, 400)
+        self.assertEqual(self.client_for(self.user).get('/api/admin/bets/export').status_code, 403)
+
+    def test_management_command(self):
+        out = StringIO()
+        call_command('export_bets', '--format', 'ndjson', '--status', 'lost', stdout=out)
+        self.assertEqual([json.loads(line)['selection'] for line in out.getvalue().splitlines()], ['Pilote'])
+
+
+class QueryPlanTests(BetFixtureMixin, TestCase):
+    """EXPLAIN every statement of the bet endpoints against a seeded dataset."""
+
+    def setUp(self):
+        super().setUp()
+        self.admin = User.objects.create_user(email='admin@example.com', password='x', name='Admin', role='admin')
+        players = [self.user] + [
+            User.objects.create_user(email=f'joueur{index}@example.com', password='x', name=f'Joueur {index}')
+            for index in range(5)
+        ]
+        self.races = [self.race] + [
+            Race.objects.create(name=f'GP {index}', circuit='Circuit', city='Ville', country='Pays', date=f'2025-0{index}-01')
+            for index in range(1, 6)
+        ]
+        # Courses passées réglées, la première encore en cours
+        Bet.objects.bulk_create(
+            Bet(
+                user=user, race=race, bet_type='winner', selection='Pilote',
+                amount=Decimal('1.00'), odds=Decimal('2.00'), potential_win=Decimal('2.00'),
+                status='pending' if race == self.race else ('won' if index == 0 else 'lost'),
+            )
+            for race in self.races
+            for user in players
+            for index in range(4)
+        )
+
+    def query_plans(self, call):
+        statements = []
+
+        def capture(execute, sql, params, many, context):
+            statements.append((sql, params))
+            return execute(sql, params, many, context)
+
+        with connection.execute_wrapper(capture):
+            response = call()
+        self.assertLess(response.status_code, 300)
+
+        plans = []
+        with connection.cursor() as cursor:
+            for sql, params in statements:
+                # Les écritures sans WHERE (INSERT, UPDATE de toute une table) n'ont rien à indexer
+                if not sql.startswith('SELECT') and not (sql.startswith(('UPDATE', 'DELETE')) and ' WHERE ' in sql):
+                    continue
+                cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+                plans.append((sql, [row[-1] for row in cursor.fetchall()]))
+        return plans
+
+    def assertIndexed(self, call):
+        for sql, plan in self.query_plans(call):
+            for step in plan:
+                with self.subTest(sql=sql, step=step):
+                    # Un parcours n'est admis que dans l'ordre d'un index (première page d'une liste),
+                    # ou pour un agrégat de toute la table, qui lit forcément chaque ligne
+                    whole_table = ' WHERE ' not in sql and ' LIMIT ' not in sql
+                    if step.startswith('SCAN ') and not whole_table:
+                        self.assertIn(' USING ', step, 'parcours complet')
+                    self.assertNotIn('USE TEMP B-TREE', step)
+
+    def test_bet_listings(self):
+        client, admin = self.client_for(self.user), self.client_for(self.admin)
+        cursor = client.get('/api/bets/my-bets?limit=5').json()['next']
+        admin_cursor = admin.get('/api/admin/bets?limit=5').json()['next']
+
+        self.assertIndexed(lambda: client.get('/api/bets/my-bets?limit=5'))
+        self.assertIndexed(lambda: client.get(f'/api/bets/my-bets?limit=5&cursor={cursor}'))
+        self.assertIndexed(lambda: admin.get('/api/admin/bets?limit=5'))
+        self.assertIndexed(lambda: admin.get(f'/api/admin/bets?limit=5&cursor={admin_cursor}'))
+
+    def test_statistics(self):
+        self.assertIndexed(lambda: self.client_for(self.admin).get('/api/admin/stats'))
+        self.assertIndexed(lambda: self.client.get(f'/api/stats/users?ids={self.user.id},{self.admin.id}'))
+
+    def test_race_settlement(self):
+        self.assertIndexed(lambda: self.client_for(self.admin).post(
+            f'/api/admin/races/{self.race.id}/result', {'finishingOrder': ['Pilote', 'B', 'C'], 'poleSitter': 'Pilote'}, format='json'
+        ))
+
+
+class RaceCardTests(BetFixtureMixin, TestCase):
+    def test_card_matches_race_and_drivers_endpoints(self):
+        url = f'/api/races/{self.race.id}/card'
+        with self.assertNumQueries(2):  # empreinte + course et engagés
+            card = self.client.get(url).json()
+
+        self.assertEqual(card['race'], self.client.get(f'/api/races/{self.race.id}').json()['race'])
+        self.assertEqual(card['drivers'], self.client.get(f'/api/races/{self.race.id}/drivers').json()['drivers'])
+        self.assertNotIn('bets', card)
+        with self.assertNumQueries(0):
+            self.client.get(url)
+
+    def test_card_with_the_callers_pending_bets(self):
+        client = self.client_for(self.user)
+        client.post('/api/bets/place', self.payload(), format='json')
+        other = User.objects.create_user(email='autre@example.com', password='x', name='Autre', balance=Decimal('100.00'))
+        self.client_for(other).post('/api/bets/place', self.payload(), format='json')
+
+        with self.assertNumQueries(2):  # course et engagés, paris
+            response = client.get(f'/api/races/{self.race.id}/card?bets=1')
+
+        body = response.json()
+        self.assertEqual([bet['userId'] for bet in body['bets']], [self.user.id])
+        self.assertEqual(body['bets'][0]['raceName'], 'GP')
+        self.assertIn('private', response['Cache-Control'])
+
+    def test_race_without_entries_and_missing_race(self):
+        race = Race.objects.create(name='Vide', circuit='Circuit', city='Ville', country='Pays', date='2025-07-01')
+        self.assertEqual(self.client.get(f'/api/races/{race.id}/card').json()['drivers'], [])
+        self.assertEqual(self.client.get('/api/races/999/card').status_code, 404)
+
+
+class ConditionalGetTests(BetFixtureMixin, TestCase):
+    def test_unchanged_catalog_is_answered_with_304_without_queries(self):
+        for url in ('/api/races', f'/api/races/{self.race.id}', f'/api/races/{self.race.id}/drivers', '/api/drivers'):
+            first = self.client.get(url)
+            self.assertEqual(first.status_code, 200)
+            with self.assertNumQueries(0):
+                cached = self.client.get(url, HTTP_IF_NONE_MATCH=first['ETag'])
+            self.assertEqual(cached.status_code, 304)
+            self.assertEqual(cached['ETag'], first['ETag'])
+        race = self.client.get(f'/api/races/{self.race.id}')
+        self.assertEqual(
+            self.client.get(f'/api/races/{self.race.id}', HTTP_IF_MODIFIED_SINCE=race['Last-Modified']).status_code, 304
+        )
+
+    def test_lists_are_validated_by_etag_only(self):
+        # Une suppression ne fait pas avancer Max(updated_at) : pas de Last-Modified pour les listes
+        for url in ('/api/races', f'/api/races/{self.race.id}/drivers', f'/api/races/{self.race.id}/card', '/api/drivers'):
+            self.assertFalse(self.client.get(url).has_header('Last-Modified'))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            removed = Driver.objects.create(name='Supprimé', team='Équipe')
+        etag = self.client.get('/api/drivers')['ETag']
+        with self.captureOnCommitCallbacks(execute=True):
+            removed.delete()
+        self.assertEqual(self.client.get('/api/drivers', HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_odds_or_driver_change_invalidates_the_etag(self):
+        url = f'/api/races/{self.race.id}/drivers'
+        etag = self.client.get(url)['ETag']
+
+        with self.captureOnCommitCallbacks(execute=True):
+            RaceDriver.objects.filter(pk=self.entry.pk).update(winner_odds=Decimal('5.00'), updated_at=timezone.now() + timedelta(seconds=1))
+            invalidate_catalog()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['drivers'][0]['winnerOdds'], 5.0)
+
+        etag = response['ETag']
+        with self.captureOnCommitCallbacks(execute=True):
+            self.driver.name = 'Pilote renommé'
+            self.driver.save()
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_rendered_catalog_is_served_without_queries_until_an_admin_write(self):
+        url = f'/api/races/{self.race.id}/drivers'
+        first = self.client.get(url)
+        with self.assertNumQueries(0):
+            cached = self.client.get(url)
+        self.assertEqual(cached.content, first.content)
+        self.assertEqual(cached['Content-Type'], first['Content-Type'])
+        self.assertEqual(cached['ETag'], first['ETag'])
+
+        admin = User.objects.create_user(email='admin@example.com', password='x', name='Admin', role='admin')
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client_for(admin).post(
+                f'/api/admin/races/{self.race.id}/drivers', {'driverId': self.driver.id, 'winnerOdds': 3.5}, format='json'
+            )
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(self.client.get(url).json()['drivers'][0]['winnerOdds'], 3.5)
+
+    def test_query_strings_share_the_rendered_entry_of_the_path(self):
+        url = f'/api/races/{self.race.id}/drivers'
+        first = self.client.get(url)
+        with self.assertNumQueries(0):
+            for index in range(3):
+                self.assertEqual(self.client.get(f'{url}?x={index}').content, first.content)
+
+    def test_missing_race_is_still_404(self):
+        self.assertEqual(self.client.get('/api/races/999', HTTP_IF_NONE_MATCH='"x"').status_code, 404)
+
+
+class SQLiteProfileTests(TestCase):
+    PRAGMAS = {'journal_mode': 'WAL', 'synchronous': 'NORMAL', 'mmap_size': 1 << 20, 'cache_size': -2048, 'busy_timeout': 1234}
+
+    def open(self, directory):
+        wrapper = DatabaseWrapper({**connection.settings_dict, 'NAME': os.path.join(directory, 'profile.sqlite3')}, alias='profile')
+        self.addCleanup(wrapper.close)
+        wrapper.ensure_connection()
+        return wrapper
+
+    def pragma(self, wrapper, name):
+        return wrapper.connection.execute(f'PRAGMA {name}').fetchone()[0]
+
+    def test_production_pragmas_are_set_on_new_connections(self):
+        with tempfile.TemporaryDirectory() as directory, override_settings(SQLITE_PRAGMAS=self.PRAGMAS):
+            wrapper = self.open(directory)
+            self.assertEqual(self.pragma(wrapper, 'journal_mode'), 'wal')
+            self.assertEqual(self.pragma(wrapper, 'synchronous'), 1)
+            self.assertEqual(self.pragma(wrapper, 'mmap_size'), 1 << 20)
+            self.assertEqual(self.pragma(wrapper, 'cache_size'), -2048)
+            self.assertEqual(self.pragma(wrapper, 'busy_timeout'), 1234)
+            wrapper.close()
+
+    def test_default_profile_leaves_sqlite_defaults(self):
+        with tempfile.TemporaryDirectory() as directory, override_settings(SQLITE_PRAGMAS={}):
+            wrapper = self.open(directory)
+            self.assertEqual(self.pragma(wrapper, 'journal_mode'), 'delete')
+            wrapper.close()
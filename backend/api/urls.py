@@ -1,6 +1,7 @@
 from django.urls import path
 
 from .views import (
+    AdminBetsExportView,
     AdminBetsView,
     AdminDriversView,
     AdminDriverDetailView,
@@ -10,6 +11,7 @@ from .views import (
     AdminImportRacesView,
     AdminRaceDetailView,
     AdminRaceDriverView,
+    AdminRaceResultView,
     AdminRacesView,
     AdminSettleBetView,
     AdminStatsView,
@@ -19,28 +21,38 @@ from .views import (
     DriverListView,
     LeaderboardView,
     LoginView,
+    LogoutView,
     MeView,
     MyBetsView,
+    MyLeaderboardRankView,
+    PlaceBetSlipView,
     PlaceBetView,
+    RaceCardView,
     RaceDetailView,
     RaceDriversView,
     RaceListView,
     SignupView,
     UserStatsView,
+    UsersStatsView,
 )
 
 urlpatterns = [
     path('auth/signup', SignupView.as_view()),
     path('auth/login', LoginView.as_view()),
+    path('auth/logout', LogoutView.as_view()),
     path('auth/me', MeView.as_view()),
     path('races', RaceListView.as_view()),
     path('races/<int:race_id>', RaceDetailView.as_view()),
     path('races/<int:race_id>/drivers', RaceDriversView.as_view()),
+    path('races/<int:race_id>/card', RaceCardView.as_view()),
     path('drivers', DriverListView.as_view()),
     path('bets/place', PlaceBetView.as_view()),
+    path('bets/place-batch', PlaceBetSlipView.as_view()),
     path('bets/my-bets', MyBetsView.as_view()),
     path('leaderboard', LeaderboardView.as_view()),
+    path('leaderboard/me', MyLeaderboardRankView.as_view()),
     path('stats/user/<int:user_id>', UserStatsView.as_view()),
+    path('stats/users', UsersStatsView.as_view()),
     # Admin
     path('admin/stats', AdminStatsView.as_view()),
     path('admin/users', AdminUsersView.as_view()),
@@ -52,7 +64,9 @@ urlpatterns = [
     path('admin/drivers/<int:driver_id>', AdminDriverDetailView.as_view()),
     path('admin/races/<int:race_id>/drivers', AdminRaceDriverView.as_view()),
     path('admin/races/<int:race_id>/drivers/<int:driver_id>', AdminRaceDriverView.as_view()),
+    path('admin/races/<int:race_id>/result', AdminRaceResultView.as_view()),
     path('admin/bets', AdminBetsView.as_view()),
+    path('admin/bets/export', AdminBetsExportView.as_view()),
     path('admin/bets/<uuid:bet_id>/settle', AdminSettleBetView.as_view()),
     path('admin/import/clean', AdminImportCleanView.as_view()),
     path('admin/import/drivers', AdminImportDriversView.as_view()),
@@ -1,31 +1,62 @@
+import time
+from datetime import datetime
 from decimal import Decimal
 from typing import Any, Dict
 
 from django.contrib.auth import authenticate
 from django.db import transaction
-from django.db.models import Count, Q, Sum
+from django.db.models import F, Q, Sum
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from django.utils.cache import patch_cache_control
 from rest_framework import status
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
 from rest_framework_simplejwt.tokens import RefreshToken
 
-from .models import Bet, Driver, Race, RaceDriver, User
+from .authentication import refresh_token_for, save_credentials
+from .betting import BetRejected, InsufficientBalance, clean_selection, place_bet, place_bets, races_for_betting
+from .catalog import (
+    cached_rendering,
+    conditional_get,
+    driver_list_version,
+    race_card,
+    race_card_version,
+    race_drivers_version,
+    race_list_version,
+    race_version,
+)
+from .export import FORMATS as EXPORT_FORMATS, ExportError, export_from_params, export_lines
+from .hashers import HashingBusy, hash_password
+from .idempotency import idempotent
+from .imports import DRIVER_KEY, RACE_KEY, base_odds_by_name, driver_rows, import_associations, reset_betting_data, upsert
+from .leaderboard import bet_settled, rank_of, rebuild_leaderboard
+from .models import Bet, Driver, LeaderboardBucket, LeaderboardEntry, Race, RaceDriver, RaceResult, User
+from .pagination import InvalidCursor, limit_offset, newest_first
+from .params import parse_id
 from .permissions import IsAdminRole
+from .revocation import revoke
+from .rows import BET_ROW, RACE_DRIVER_ROW, USER_ROW
 from .seed_data import DRIVERS_2025, RACES_2025
 from .serializers import (
     BetSerializer,
     DriverSerializer,
     LeaderboardEntrySerializer,
     RaceDriverSerializer,
+    RaceResultSerializer,
     RaceSerializer,
     UserSerializer,
     UserStatsSerializer,
 )
+from .settlement import settle_race
+from .stats import user_stats
 
 
 def build_tokens(user: User) -> Dict[str, str]:
-    refresh = RefreshToken.for_user(user)
+    refresh = refresh_token_for(user)
     return {'access': str(refresh.access_token), 'refresh': str(refresh)}
 
 
@@ -33,6 +64,14 @@ def serialize_user(user: User) -> Dict[str, Any]:
     return UserSerializer(user).data
 
 
+def hashing_busy() -> Response:
+    return Response(
+        {'error': 'Trop de connexions en cours, réessayez dans un instant'},
+        status=status.HTTP_503_SERVICE_UNAVAILABLE,
+        headers={'Retry-After': '1'},
+    )
+
+
 class SignupView(APIView):
     permission_classes = [AllowAny]
 
@@ -47,7 +86,11 @@ class SignupView(APIView):
         if User.objects.filter(email=email).exists():
             return Response({'error': 'Un compte existe déjà avec cet email'}, status=status.HTTP_400_BAD_REQUEST)
 
-        user = User.objects.create_user(email=email, password=password, name=name)
+        try:
+            password_hash = hash_password(password)
+        except HashingBusy:
+            return hashing_busy()
+        user = User.objects.create_user(email=email, password_hash=password_hash, name=name)
         tokens = build_tokens(user)
         return Response({'user': serialize_user(user), **tokens}, status=status.HTTP_201_CREATED)
 
@@ -62,7 +105,10 @@ class LoginView(APIView):
         if not all([email, password]):
             return Response({'error': 'Email et mot de passe requis'}, status=status.HTTP_400_BAD_REQUEST)
 
-        user = authenticate(request, email=email, password=password)
+        try:
+            user = authenticate(request, email=email, password=password)
+        except HashingBusy:
+            return hashing_busy()
         if not user:
             return Response({'error': 'Identifiants invalides'}, status=status.HTTP_401_UNAUTHORIZED)
 
@@ -73,16 +119,40 @@ class LoginView(APIView):
         return Response({'user': serialize_user(user), **tokens})
 
 
+class LogoutView(APIView):
+    """Revoke the access token of the request and, if sent, its refresh token."""
+
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        tokens = [request.auth]
+        if request.data.get('refresh'):
+            try:
+                refresh = RefreshToken(request.data['refresh'])
+            except TokenError:
+                return Response({'error': 'Jeton de rafraîchissement invalide'}, status=status.HTTP_400_BAD_REQUEST)
+            if str(refresh.get(jwt_settings.USER_ID_CLAIM)) != str(request.user.pk):
+                return Response({'error': 'Jeton de rafraîchissement invalide'}, status=status.HTTP_400_BAD_REQUEST)
+            tokens.append(refresh)
+
+        revoke(tokens)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
 class MeView(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
-        return Response({'user': serialize_user(request.user)})
+        # Solde et totaux relus en une requête : l'utilisateur authentifié peut venir du cache
+        user = User.objects.with_bet_totals().get(pk=request.user.pk)
+        return Response({'user': serialize_user(user)})
 
 
 class RaceListView(APIView):
     permission_classes = [AllowAny]
 
+    @cached_rendering
+    @conditional_get(race_list_version)
     def get(self, request):
         races = Race.objects.all().order_by('date')
         return Response({'races': RaceSerializer(races, many=True).data})
@@ -91,6 +161,8 @@ class RaceListView(APIView):
 class RaceDetailView(APIView):
     permission_classes = [AllowAny]
 
+    @cached_rendering
+    @conditional_get(race_version)
     def get(self, request, race_id: int):
         try:
             race = Race.objects.get(pk=race_id)
@@ -102,19 +174,64 @@ class RaceDetailView(APIView):
 class RaceDriversView(APIView):
     permission_classes = [AllowAny]
 
+    @cached_rendering
+    @conditional_get(race_drivers_version)
     def get(self, request, race_id: int):
         try:
             race = Race.objects.get(pk=race_id)
         except Race.DoesNotExist:
             return Response({'error': 'Course introuvable'}, status=status.HTTP_404_NOT_FOUND)
 
-        entries = race.entries.select_related('driver').all()
-        return Response({'drivers': RaceDriverSerializer(entries, many=True).data})
+        entries = RACE_DRIVER_ROW.rows(race.entries.order_by('pk'))
+        return Response({'drivers': RACE_DRIVER_ROW.many(entries)})
+
+
+class RaceCardView(APIView):
+    """Everything a race page needs in one request: the race, its entries and odds.
+
+    With `?bets=1`, an authenticated caller also gets their pending bets on the
+    race; that response is private and not cached.
+    """
+
+    permission_classes = [AllowAny]
+
+    def get(self, request, race_id: int):
+        if request.query_params.get('bets') and request.user.is_authenticated:
+            return self.personal_card(request, race_id)
+        return self.public_card(request, race_id)
+
+    @cached_rendering
+    @conditional_get(race_card_version)
+    def public_card(self, request, race_id: int):
+        card = race_card(race_id)
+        if card is None:
+            return Response({'error': 'Course introuvable'}, status=status.HTTP_404_NOT_FOUND)
+        race, entries = card
+        return Response({'race': RaceSerializer(race).data, 'drivers': RaceDriverSerializer(entries, many=True).data})
+
+    def personal_card(self, request, race_id: int):
+        card = race_card(race_id)
+        if card is None:
+            return Response({'error': 'Course introuvable'}, status=status.HTTP_404_NOT_FOUND)
+        race, entries = card
+
+        bets = list(request.user.bets.filter(race_id=race_id, status='pending').order_by('-created_at', '-id'))
+        for bet in bets:
+            bet.race = race
+        response = Response({
+            'race': RaceSerializer(race).data,
+            'drivers': RaceDriverSerializer(entries, many=True).data,
+            'bets': BetSerializer(bets, many=True).data,
+        })
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
 
 
 class DriverListView(APIView):
     permission_classes = [AllowAny]
 
+    @cached_rendering
+    @conditional_get(driver_list_version)
     def get(self, request):
         drivers = Driver.objects.all().order_by('name')
         return Response({'drivers': DriverSerializer(drivers, many=True).data})
@@ -123,127 +240,170 @@ class DriverListView(APIView):
 class PlaceBetView(APIView):
     permission_classes = [IsAuthenticated]
 
+    @idempotent
     def post(self, request):
         user = request.user
         if user.banned:
             return Response({'error': 'Votre compte est banni'}, status=status.HTTP_403_FORBIDDEN)
 
-        race_id = request.data.get('raceId')
-        bet_type = request.data.get('betType')
-        selection = request.data.get('selection')
-        amount = request.data.get('amount')
-        odds = request.data.get('odds')
+        race_id = parse_id(request.data.get('raceId'))
+        races = races_for_betting([race_id]) if race_id is not None else {}
 
-        if not all([race_id, bet_type, selection, amount, odds]):
-            return Response({'error': 'Tous les champs sont requis'}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            selection = clean_selection(request.data, races)
+        except BetRejected as exc:
+            return Response(exc.payload, status=exc.status_code)
 
         try:
-            race = Race.objects.get(pk=race_id)
-        except Race.DoesNotExist:
-            return Response({'error': 'Course introuvable'}, status=status.HTTP_404_NOT_FOUND)
+            bet = place_bet(user, **selection)
+        except InsufficientBalance:
+            return Response({'error': 'Solde insuffisant'}, status=status.HTTP_400_BAD_REQUEST)
 
-        amount = Decimal(str(amount))
-        odds = Decimal(str(odds))
+        return Response({'bet': BetSerializer(bet).data}, status=status.HTTP_201_CREATED)
 
-        if user.balance < amount:
-            return Response({'error': 'Solde insuffisant'}, status=status.HTTP_400_BAD_REQUEST)
 
-        with transaction.atomic():
-            bet = Bet.objects.create(
-                user=user,
-                race=race,
-                bet_type=bet_type,
-                selection=selection,
-                amount=amount,
-                odds=odds,
+class PlaceBetSlipView(APIView):
+    """Place every selection of a bet slip at once; the slip is all-or-nothing."""
+
+    permission_classes = [IsAuthenticated]
+    MAX_SELECTIONS = 50
+
+    @idempotent
+    def post(self, request):
+        user = request.user
+        if user.banned:
+            return Response({'error': 'Votre compte est banni'}, status=status.HTTP_403_FORBIDDEN)
+
+        items = request.data.get('bets')
+        if not isinstance(items, list) or not items:
+            return Response({'error': 'Aucun pari sélectionné'}, status=status.HTTP_400_BAD_REQUEST)
+        if len(items) > self.MAX_SELECTIONS:
+            return Response(
+                {'error': f'{self.MAX_SELECTIONS} paris maximum par ticket'},
+                status=status.HTTP_400_BAD_REQUEST,
             )
-            user.balance -= amount
-            user.save(update_fields=['balance'])
+        if not all(isinstance(item, dict) for item in items):
+            return Response({'error': 'Pari invalide'}, status=status.HTTP_400_BAD_REQUEST)
 
-        return Response({'bet': BetSerializer(bet).data}, status=status.HTTP_201_CREATED)
+        race_ids = {parse_id(item.get('raceId')) for item in items} - {None}
+        races = races_for_betting(race_ids)
+
+        selections = []
+        for index, item in enumerate(items):
+            try:
+                selections.append(clean_selection(item, races))
+            except BetRejected as exc:
+                return Response({**exc.payload, 'index': index}, status=exc.status_code)
+
+        try:
+            bets = place_bets(user, selections)
+        except InsufficientBalance:
+            return Response({'error': 'Solde insuffisant'}, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response({'bets': BetSerializer(bets, many=True).data}, status=status.HTTP_201_CREATED)
 
 
 class MyBetsView(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
-        bets = request.user.bets.select_related('race').order_by('-created_at')
-        return Response({'bets': BetSerializer(bets, many=True).data})
+        try:
+            bets, cursor = newest_first(request, BET_ROW.rows(request.user.bets.all()), default_limit=50, max_limit=200)
+        except InvalidCursor:
+            return Response({'error': 'Curseur invalide'}, status=status.HTTP_400_BAD_REQUEST)
+        return Response({'bets': BET_ROW.many(bets), 'next': cursor})
+
+
+def leaderboard_row(entry, rank: int) -> Dict[str, Any]:
+    user = entry.user
+    win_rate = 0.0
+    if entry.total_bets:
+        win_rate = round((entry.total_wins / entry.total_bets) * 100, 2)
+    return {
+        'rank': rank,
+        'id': user.id,
+        'name': user.name,
+        'email': user.email,
+        'totalBets': entry.total_bets,
+        'totalWins': entry.total_wins,
+        'totalLosses': entry.total_losses,
+        'winRate': win_rate,
+        'profit': float(entry.profit),
+        'balance': float(user.balance),
+    }
 
 
 class LeaderboardView(APIView):
     permission_classes = [AllowAny]
 
     def get(self, request):
-        users = User.objects.annotate(
-            total_bets=Count('bets'),
-            total_wins=Count('bets', filter=Q(bets__status='won')),
-            total_losses=Count('bets', filter=Q(bets__status='lost')),
-            won_amount=Sum('bets__potential_win', filter=Q(bets__status='won')),
-            lost_amount=Sum('bets__amount', filter=Q(bets__status='lost')),
-        )
+        limit, offset = limit_offset(request, default_limit=100, max_limit=500)
+        race_id = request.query_params.get('race')
+        period = request.query_params.get('period')
+
+        if race_id:
+            race_pk = parse_id(race_id)
+            if race_pk is None:
+                return Response({'error': 'Course invalide'}, status=status.HTTP_400_BAD_REQUEST)
+            entries = LeaderboardBucket.objects.filter(bucket=LeaderboardBucket.race_key(race_pk))
+        elif period:
+            try:
+                month = datetime.strptime(period, '%Y-%m')
+            except ValueError:
+                return Response({'error': 'Période invalide (format AAAA-MM)'}, status=status.HTTP_400_BAD_REQUEST)
+            entries = LeaderboardBucket.objects.filter(bucket=LeaderboardBucket.month_key(month))
+        else:
+            entries = LeaderboardEntry.objects.all()
+
+        entries = entries.select_related('user').order_by('-profit', 'user_id')[offset:offset + limit]
+        leaderboard = [leaderboard_row(entry, rank) for rank, entry in enumerate(entries, start=offset + 1)]
+        return Response({
+            'leaderboard': LeaderboardEntrySerializer(leaderboard, many=True).data,
+            'next': offset + limit if len(leaderboard) == limit else None,
+        })
 
-        leaderboard = []
-        for user in users:
-            won_amount = user.won_amount or Decimal('0.0')
-            lost_amount = user.lost_amount or Decimal('0.0')
-            profit = float(won_amount - lost_amount)
-            win_rate = 0.0
-            if user.total_bets:
-                win_rate = round((user.total_wins / user.total_bets) * 100, 2)
-
-            leaderboard.append({
-                'id': user.id,
-                'name': user.name,
-                'email': user.email,
-                'totalBets': user.total_bets,
-                'totalWins': user.total_wins,
-                'totalLosses': user.total_losses,
-                'winRate': win_rate,
-                'profit': profit,
-                'balance': float(user.balance),
-            })
-
-        leaderboard.sort(key=lambda entry: entry['profit'], reverse=True)
-        return Response({'leaderboard': LeaderboardEntrySerializer(leaderboard, many=True).data})
+
+class MyLeaderboardRankView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        entry, _ = LeaderboardEntry.objects.select_related('user').get_or_create(user=request.user)
+        return Response({'entry': LeaderboardEntrySerializer(leaderboard_row(entry, rank_of(entry))).data})
 
 
 class UserStatsView(APIView):
     permission_classes = [AllowAny]
 
     def get(self, request, user_id: int):
-        try:
-            user = User.objects.get(pk=user_id)
-        except User.DoesNotExist:
+        stats = user_stats([user_id]).get(user_id)
+        if stats is None:
             return Response({'error': 'Utilisateur introuvable'}, status=status.HTTP_404_NOT_FOUND)
+        return Response({'stats': UserStatsSerializer(stats).data})
 
-        bets = user.bets.all()
-        total_bets = bets.count()
-        won_bets = bets.filter(status='won').count()
-        lost_bets = bets.filter(status='lost').count()
-        pending_bets = bets.filter(status='pending').count()
-        total_staked = bets.aggregate(total=Sum('amount'))['total'] or Decimal('0.0')
-        best_win = bets.filter(status='won').order_by('-potential_win').first()
-
-        won_amount = bets.filter(status='won').aggregate(total=Sum('potential_win'))['total'] or Decimal('0.0')
-        lost_amount = bets.filter(status='lost').aggregate(total=Sum('amount'))['total'] or Decimal('0.0')
-        profit = won_amount - lost_amount
-        roi = (profit / total_staked * 100) if total_staked > 0 else Decimal('0.0')
-        avg_stake = (total_staked / total_bets) if total_bets > 0 else Decimal('0.0')
-
-        stats = {
-            'totalBets': total_bets,
-            'wonBets': won_bets,
-            'lostBets': lost_bets,
-            'pendingBets': pending_bets,
-            'profit': float(profit),
-            'roi': float(roi),
-            'totalStaked': float(total_staked),
-            'averageStake': float(avg_stake),
-            'bestWin': BetSerializer(best_win).data if best_win else None,
-        }
 
-        return Response({'stats': UserStatsSerializer(stats).data})
+class UsersStatsView(APIView):
+    """Statistics of several users at once (`?ids=1,2,3`), for profile comparison."""
+
+    permission_classes = [AllowAny]
+    MAX_USERS = 50
+
+    def get(self, request):
+        user_ids = {parse_id(value) for value in request.query_params.get('ids', '').split(',') if value.strip()}
+        if None in user_ids:
+            return Response({'error': 'Identifiants invalides'}, status=status.HTTP_400_BAD_REQUEST)
+
+        if not user_ids:
+            return Response({'error': 'Identifiants requis'}, status=status.HTTP_400_BAD_REQUEST)
+        if len(user_ids) > self.MAX_USERS:
+            return Response(
+                {'error': f'{self.MAX_USERS} utilisateurs maximum'},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        stats = user_stats(user_ids)
+        return Response({
+            'stats': {str(user_id): UserStatsSerializer(entry).data for user_id, entry in stats.items()},
+        })
 
 
 # -------------------- Admin endpoints --------------------
@@ -272,8 +432,19 @@ class AdminUsersView(APIView):
     permission_classes = [IsAuthenticated, IsAdminRole]
 
     def get(self, request):
-        users = User.objects.all().order_by('created_at')
-        return Response({'users': UserSerializer(users, many=True).data})
+        limit, offset = limit_offset(request, default_limit=100, max_limit=500)
+        users = User.objects.with_bet_totals().order_by('created_at', 'id')
+
+        search = request.query_params.get('search', '').strip()
+        if search:
+            users = users.filter(Q(email__icontains=search) | Q(name__icontains=search))
+
+        page = USER_ROW.many(USER_ROW.rows(users)[offset:offset + limit])
+        return Response({
+            'users': page,
+            'count': users.count(),
+            'next': offset + limit if len(page) == limit else None,
+        })
 
 
 class AdminUserBanView(APIView):
@@ -281,7 +452,7 @@ class AdminUserBanView(APIView):
 
     def patch(self, request, user_id: int):
         try:
-            user = User.objects.get(pk=user_id)
+            user = User.objects.with_bet_totals().get(pk=user_id)
         except User.DoesNotExist:
             return Response({'error': 'Utilisateur introuvable'}, status=status.HTTP_404_NOT_FOUND)
 
@@ -290,7 +461,7 @@ class AdminUserBanView(APIView):
             return Response({'error': 'Valeur manquante'}, status=status.HTTP_400_BAD_REQUEST)
 
         user.banned = bool(banned)
-        user.save(update_fields=['banned'])
+        save_credentials(user, ['banned'])
         return Response({'user': UserSerializer(user).data})
 
 
@@ -299,7 +470,7 @@ class AdminUserRoleView(APIView):
 
     def patch(self, request, user_id: int):
         try:
-            user = User.objects.get(pk=user_id)
+            user = User.objects.with_bet_totals().get(pk=user_id)
         except User.DoesNotExist:
             return Response({'error': 'Utilisateur introuvable'}, status=status.HTTP_404_NOT_FOUND)
 
@@ -309,7 +480,7 @@ class AdminUserRoleView(APIView):
 
         user.role = role
         user.is_staff = role == 'admin'
-        user.save(update_fields=['role', 'is_staff'])
+        save_credentials(user, ['role', 'is_staff'])
         return Response({'user': UserSerializer(user).data})
 
 
@@ -344,7 +515,11 @@ class AdminRaceDetailView(APIView):
             race = Race.objects.get(pk=race_id)
         except Race.DoesNotExist:
             return Response({'error': 'Course introuvable'}, status=status.HTTP_404_NOT_FOUND)
-        race.delete()
+
+        with transaction.atomic():
+            bettors = list(race.bets.values_list('user_id', flat=True).distinct())
+            race.delete()
+            rebuild_leaderboard(bettors)
         return Response(status=status.HTTP_204_NO_CONTENT)
 
 
@@ -423,16 +598,40 @@ class AdminBetsView(APIView):
     permission_classes = [IsAuthenticated, IsAdminRole]
 
     def get(self, request):
-        bets = Bet.objects.select_related('user', 'race').order_by('-created_at')
-        return Response({'bets': BetSerializer(bets, many=True).data})
+        try:
+            bets, cursor = newest_first(request, BET_ROW.rows(Bet.objects.all()), default_limit=100, max_limit=500)
+        except InvalidCursor:
+            return Response({'error': 'Curseur invalide'}, status=status.HTTP_400_BAD_REQUEST)
+        return Response({'bets': BET_ROW.many(bets), 'next': cursor})
+
+
+class AdminBetsExportView(APIView):
+    """Stream the bets as CSV (default) or NDJSON (`?output=ndjson`), filtered by
+    `?from=&to=` (AAAA-MM-JJ), `?race=` and `?status=`."""
+
+    permission_classes = [IsAuthenticated, IsAdminRole]
+
+    def get(self, request):
+        fmt = request.query_params.get('output', 'csv')
+        if fmt not in EXPORT_FORMATS:
+            return Response({'error': 'Format invalide (csv ou ndjson)'}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            rows = export_from_params(request.query_params)
+        except ExportError as exc:
+            return Response({'error': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+
+        response = StreamingHttpResponse(export_lines(rows, fmt), content_type=EXPORT_FORMATS[fmt])
+        response['Content-Disposition'] = f'attachment; filename="paris-{timezone.localdate():%Y%m%d}.{fmt}"'
+        return response
 
 
 class AdminSettleBetView(APIView):
     permission_classes = [IsAuthenticated, IsAdminRole]
 
+    @idempotent
     def patch(self, request, bet_id):
         try:
-            bet = Bet.objects.select_related('user').get(pk=bet_id)
+            bet = Bet.objects.select_related('race').get(pk=bet_id)
         except Bet.DoesNotExist:
             return Response({'error': 'Pari introuvable'}, status=status.HTTP_404_NOT_FOUND)
 
@@ -444,61 +643,72 @@ class AdminSettleBetView(APIView):
             return Response({'error': 'Pari déjà résolu'}, status=status.HTTP_400_BAD_REQUEST)
 
         with transaction.atomic():
+            # Mise à jour conditionnelle : un double règlement concurrent ne crédite qu'une fois
             bet.status = result
-            bet.save(update_fields=['status', 'updated_at'])
+            bet.updated_at = timezone.now()
+            settled = Bet.objects.filter(pk=bet.pk, status='pending').update(status=result, updated_at=bet.updated_at)
+            if not settled:
+                return Response({'error': 'Pari déjà résolu'}, status=status.HTTP_400_BAD_REQUEST)
 
             if result == 'won':
-                bet.user.balance += bet.potential_win
-                bet.user.save(update_fields=['balance'])
+                User.objects.filter(pk=bet.user_id).update(balance=F('balance') + bet.potential_win)
+            bet_settled(bet)
 
         return Response({'bet': BetSerializer(bet).data})
 
 
-class AdminImportCleanView(APIView):
+class AdminRaceResultView(APIView):
     permission_classes = [IsAuthenticated, IsAdminRole]
 
-    def post(self, request):
-        deleted_entries = {
-            'bets': Bet.objects.count(),
-            'raceDrivers': RaceDriver.objects.count(),
-            'races': Race.objects.count(),
-            'drivers': Driver.objects.count(),
-        }
-        # Suppression complète des paris
-        Bet.objects.all().delete()
-        RaceDriver.objects.all().delete()
-        Race.objects.all().delete()
-        Driver.objects.all().delete()
+    @idempotent
+    def post(self, request, race_id: int):
+        try:
+            race = Race.objects.get(pk=race_id)
+        except Race.DoesNotExist:
+            return Response({'error': 'Course introuvable'}, status=status.HTTP_404_NOT_FOUND)
 
-        # Remise à 1000€ du solde de tous les utilisateurs
-        User.objects.all().update(balance=Decimal('1000'))
+        instance = RaceResult.objects.filter(race=race).first()
+        serializer = RaceResultSerializer(instance, data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
-        return Response({'deleted': sum(deleted_entries.values()), 'details': deleted_entries})
+        with transaction.atomic():
+            result = serializer.save(race=race)
+            summary = settle_race(result)
+        return Response({'result': RaceResultSerializer(result).data, **summary})
 
 
-class AdminImportDriversView(APIView):
+class AdminImportCleanView(APIView):
     permission_classes = [IsAuthenticated, IsAdminRole]
 
     def post(self, request):
-        Driver.objects.all().delete()
-        driver_instances = []
-        for driver in DRIVERS_2025:
-            payload = driver.copy()
-            payload.pop('base_odds', None)
-            driver_instances.append(Driver(**payload))
+        started = time.monotonic()
+        # Tout ou rien : suppressions par lots, sans charger les lignes ni émuler les cascades
+        with transaction.atomic():
+            deleted = reset_betting_data()
+        return Response({
+            'deleted': sum(deleted.values()),
+            'details': deleted,
+            'durationMs': round((time.monotonic() - started) * 1000),
+        })
 
-        Driver.objects.bulk_create(driver_instances)
-        return Response({'count': len(driver_instances)})
+
+class AdminImportDriversView(APIView):
+    permission_classes = [IsAuthenticated, IsAdminRole]
+
+    def post(self, request):
+        # Mise à jour sur place : supprimer les pilotes emporterait leurs cotes
+        report = upsert(Driver, driver_rows(DRIVERS_2025), DRIVER_KEY)
+        return Response(report.as_data())
 
 
 class AdminImportRacesView(APIView):
     permission_classes = [IsAuthenticated, IsAdminRole]
 
     def post(self, request):
-        Race.objects.all().delete()
-        races = [Race(**race) for race in RACES_2025]
-        Race.objects.bulk_create(races)
-        return Response({'count': len(races)})
+        # Mise à jour sur place : supprimer les courses emporterait leurs paris
+        report = upsert(Race, RACES_2025, RACE_KEY)
+        return Response(report.as_data())
 
 
 class AdminImportAssociationsView(APIView):
@@ -511,23 +721,5 @@ class AdminImportAssociationsView(APIView):
         if not drivers or not races:
             return Response({'error': "Importez d'abord les pilotes et les courses"}, status=status.HTTP_400_BAD_REQUEST)
 
-        RaceDriver.objects.all().delete()
-        created = 0
-
-        for race in races:
-            for driver in drivers:
-                base_odds = next((d['base_odds'] for d in DRIVERS_2025 if d['name'] == driver.name), 25.0)
-                winner = Decimal(str(base_odds))
-                podium = max(winner * Decimal('0.6'), Decimal('1.50'))
-                pole = max(winner * Decimal('0.8'), Decimal('1.80'))
-
-                RaceDriver.objects.create(
-                    race=race,
-                    driver=driver,
-                    winner_odds=winner,
-                    podium_odds=podium,
-                    pole_odds=pole,
-                )
-                created += 1
-
+        created = import_associations(races, drivers, base_odds_by_name(DRIVERS_2025))
         return Response({'count': created})
@@ -9,10 +9,13 @@ Paramètres Django du projet.
   - DJANGO_CORS_ALLOW_ALL = False (recommandé)
 """
 
+import importlib.util
 import os
 from datetime import timedelta
 from pathlib import Path
 
+from django.core.exceptions import ImproperlyConfigured
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -92,10 +95,73 @@ WSGI_APPLICATION = 'config.wsgi.application'
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+        'NAME': os.environ.get("DJANGO_SQLITE_PATH", BASE_DIR / 'db.sqlite3'),
     }
 }
 
+# Profil SQLite de production : DJANGO_SQLITE_PROFILE=production.
+# Journal WAL (les lectures ne bloquent plus l'écriture et inversement),
+# synchronous=NORMAL (pas de fsync à chaque commit en WAL), mmap et cache de
+# pages, attente du verrou au lieu de "database is locked", et connexions
+# gardées ouvertes entre les requêtes. Les pragmas sont posés à l'ouverture de
+# chaque connexion (api.database).
+SQLITE_PROFILE = os.environ.get("DJANGO_SQLITE_PROFILE", "")
+if SQLITE_PROFILE not in ("", "production"):
+    raise ImproperlyConfigured(f"DJANGO_SQLITE_PROFILE inconnu : {SQLITE_PROFILE!r}")
+
+SQLITE_PRAGMAS = {}
+if SQLITE_PROFILE == "production":
+    SQLITE_BUSY_TIMEOUT_MS = int(os.environ.get("DJANGO_SQLITE_BUSY_TIMEOUT_MS", "5000"))
+    SQLITE_PRAGMAS = {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'mmap_size': int(os.environ.get("DJANGO_SQLITE_MMAP_SIZE", str(256 * 1024 * 1024))),
+        # Négatif : taille en Kio, par connexion
+        'cache_size': -int(os.environ.get("DJANGO_SQLITE_CACHE_KB", str(64 * 1024))),
+        'busy_timeout': SQLITE_BUSY_TIMEOUT_MS,
+    }
+    DATABASES['default'].update(
+        CONN_MAX_AGE=int(os.environ.get("DJANGO_CONN_MAX_AGE", "600")),
+        CONN_HEALTH_CHECKS=True,
+        OPTIONS={
+            # BEGIN IMMEDIATE : le verrou d'écriture est attendu en début de
+            # transaction ; en mode DEFERRED, une transaction qui lit puis écrit
+            # échoue sans attendre si un autre thread écrit déjà
+            'transaction_mode': 'IMMEDIATE',
+            'timeout': SQLITE_BUSY_TIMEOUT_MS / 1000,
+        },
+    )
+
+
+# Cache
+# Mémoire locale par défaut (un cache par worker). En production, définir
+# DJANGO_REDIS_URL=redis://host:6379/0 pour partager le cache entre workers
+# (nécessite le paquet `redis`).
+
+if os.environ.get("DJANGO_REDIS_URL"):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.environ["DJANGO_REDIS_URL"],
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
+# Réponses JSON du catalogue (courses, pilotes, cotes) : en plus du cache
+# mémoire de chaque worker, les partager via le cache Django (Redis)
+CATALOG_CACHE_SHARED = bool(os.environ.get("DJANGO_REDIS_URL"))
+
+# Version du catalogue : chaque worker relit aussi le nombre de lignes et la date de
+# dernière modification des courses, pilotes et cotes au plus toutes les
+# CATALOG_VERSION_REFRESH, pour voir les changements faits par un autre worker
+# même quand le cache n'est pas partagé
+CATALOG_VERSION_REFRESH = timedelta(seconds=2)
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
@@ -116,6 +182,49 @@ AUTH_PASSWORD_VALIDATORS = [
 ]
 
 
+AUTHENTICATION_BACKENDS = ['api.hashers.PasswordBackend']
+
+# Hachage des mots de passe : DJANGO_PASSWORD_HASHER choisit le profil des nouveaux
+# mots de passe (pbkdf2, scrypt, ou argon2 avec argon2-cffi) et PASSWORD_HASHER_COSTS
+# leur coût. Les autres profils restent vérifiables : un mot de passe est réécrit au
+# profil et au coût courants à la connexion suivante.
+PASSWORD_HASHER = os.environ.get("DJANGO_PASSWORD_HASHER", "pbkdf2")
+PASSWORD_HASHER_COSTS = {
+    'pbkdf2': {'iterations': int(os.environ.get("DJANGO_PBKDF2_ITERATIONS", "870000"))},
+    'scrypt': {
+        'work_factor': int(os.environ.get("DJANGO_SCRYPT_WORK_FACTOR", str(2 ** 14))),
+        'block_size': 8,
+        'parallelism': 1,
+    },
+    'argon2': {
+        'time_cost': int(os.environ.get("DJANGO_ARGON2_TIME_COST", "2")),
+        'memory_cost': int(os.environ.get("DJANGO_ARGON2_MEMORY_COST", "65536")),
+        'parallelism': 1,
+    },
+}
+_PASSWORD_HASHER_CLASSES = {
+    'pbkdf2': 'api.hashers.PBKDF2PasswordHasher',
+    'scrypt': 'api.hashers.ScryptPasswordHasher',
+    'argon2': 'api.hashers.Argon2PasswordHasher',
+}
+if PASSWORD_HASHER not in _PASSWORD_HASHER_CLASSES:
+    raise ImproperlyConfigured(f"DJANGO_PASSWORD_HASHER inconnu : {PASSWORD_HASHER}")
+if PASSWORD_HASHER == 'argon2' and not importlib.util.find_spec("argon2"):
+    raise ImproperlyConfigured("Le profil argon2 demande le paquet argon2-cffi")
+PASSWORD_HASHERS = [
+    _PASSWORD_HASHER_CLASSES[PASSWORD_HASHER],
+    *(path for name, path in _PASSWORD_HASHER_CLASSES.items() if name != PASSWORD_HASHER),
+]
+
+# Hachages exécutés par un pool de processus dédié et borné, pour qu'une rafale de
+# connexions n'occupe pas tous les workers (0 : dans le thread de la requête). Au-delà
+# de PASSWORD_HASHING_QUEUE hachages en cours ou en attente, une connexion attend au
+# plus PASSWORD_HASHING_WAIT secondes puis reçoit une 503.
+PASSWORD_HASHING_WORKERS = int(os.environ.get("DJANGO_PASSWORD_HASHING_WORKERS", max(1, (os.cpu_count() or 2) // 2)))
+PASSWORD_HASHING_QUEUE = PASSWORD_HASHING_WORKERS * 4
+PASSWORD_HASHING_WAIT = 2
+
+
 # Internationalization
 # https://docs.djangoproject.com/en/5.1/topics/i18n/
 
@@ -151,11 +260,23 @@ AUTH_USER_MODEL = 'api.User'
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'api.authentication.JWTAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.AllowAny',
     ),
+    # orjson à la place du module json de la bibliothèque standard
+    'DEFAULT_RENDERER_CLASSES': (
+        'api.renderers.JSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+        # Accept: application/msgpack
+        'api.renderers.MessagePackRenderer',
+    ),
+    'DEFAULT_PARSER_CLASSES': (
+        'api.renderers.JSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ),
 }
 
 SIMPLE_JWT = {
@@ -164,6 +285,28 @@ SIMPLE_JWT = {
     'AUTH_HEADER_TYPES': ('Bearer',),
 }
 
+# Idempotency-Key : durée de conservation des réponses rejouables et taille
+# du cache mémoire (par worker) placé devant la table IdempotencyKey
+IDEMPOTENCY_KEY_TTL = timedelta(hours=24)
+IDEMPOTENCY_CACHE_SIZE = 10_000
+
+# Authentification : lignes User gardées en mémoire par chaque worker (LRU), revalidées
+# par la version des droits (rôle, bannissement) que portent les jetons. Sans cache
+# partagé (Redis), un changement fait par un autre worker est vu au plus tard après
+# AUTH_USER_CACHE_TTL
+AUTH_USER_CACHE_SIZE = 10_000
+AUTH_USER_CACHE_TTL = timedelta(minutes=1)
+
+# Révocation des jetons (déconnexion) : table RevokedToken, reflétée dans un filtre de
+# Bloom par worker. Chaque worker y ajoute les révocations créées depuis sa dernière
+# lecture au plus toutes les TOKEN_REVOCATION_REFRESH (sans dépendre d'un cache
+# partagé) et reconstruit son filtre toutes les TOKEN_REVOCATION_REBUILD pour oublier
+# les jetons expirés
+TOKEN_REVOCATION_CAPACITY = 100_000
+TOKEN_REVOCATION_ERROR_RATE = 0.001
+TOKEN_REVOCATION_REFRESH = timedelta(seconds=2)
+TOKEN_REVOCATION_REBUILD = timedelta(hours=1)
+
 # CORS : par défaut ouvert pour le dev, à restreindre en prod
 CORS_ALLOW_ALL_ORIGINS = os.environ.get("DJANGO_CORS_ALLOW_ALL", "True") == "True"
 CORS_ALLOW_CREDENTIALS = True
@@ -24,6 +24,8 @@ django.setup()
 
 from api.models import User, Race, Driver, RaceDriver, Bet  # noqa: E402
 from api.seed_data import RACES_2025, DRIVERS_2025  # noqa: E402
+from api.imports import base_odds_by_name, import_associations  # noqa: E402
+from api.leaderboard import rebuild_leaderboard  # noqa: E402
 
 
 # -----------------------------
@@ -102,27 +104,7 @@ def create_drivers():
 # Associations course/pilote + cotes
 # -----------------------------
 def create_race_drivers(races, drivers):
-    RaceDriver.objects.all().delete()
-
-    # Map pour retrouver les base_odds par nom de pilote
-    base_odds_map = {d["name"]: Decimal(str(d.get("base_odds", 25.0))) for d in DRIVERS_2025}
-
-    created = 0
-    for race in races:
-        for driver in drivers:
-            base = base_odds_map.get(driver.name, Decimal("25.0"))
-            winner = base
-            podium = max(winner * Decimal("0.6"), Decimal("1.50"))
-            pole = max(winner * Decimal("0.8"), Decimal("1.80"))
-
-            RaceDriver.objects.create(
-                race=race,
-                driver=driver,
-                winner_odds=winner,
-                podium_odds=podium,
-                pole_odds=pole,
-            )
-            created += 1
+    created = import_associations(races, drivers, base_odds_by_name(DRIVERS_2025))
 
     print(f"{created} associations course/pilote créées.")
     return RaceDriver.objects.select_related("race", "driver").all()
@@ -183,4 +165,5 @@ if __name__ == "__main__":
     drivers = create_drivers()
     race_drivers = create_race_drivers(races, drivers)
     create_sample_bets(users, race_drivers)
+    rebuild_leaderboard()
     print("Peuplement terminé ✅")